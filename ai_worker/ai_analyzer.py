@@ -1,64 +1,363 @@
-import torch
-from transformers import pipeline
+import os
+import threading
 from loguru import logger
 
+# torch/transformers are imported inside the methods that need them so that
+# importing this module (and starting the worker) stays cheap
+
+MODEL_NAME = "nlptown/bert-base-multilingual-uncased-sentiment"
+CACHE_DIR = os.getenv('MODEL_CACHE_DIR', './cache')
+BUCKET_SIZE = int(os.getenv('BUCKET_SIZE', '8'))
+MAX_LENGTH = 512
+# Sequence lengths the compiled GPU model is padded to, so it only ever sees these shapes
+SEQ_BUCKETS = (64, 128, 256, MAX_LENGTH)
+TRITON_URL = os.getenv('TRITON_URL')
+TRITON_MODEL = os.getenv('TRITON_MODEL', 'sentiment')
+
 class SentimentAnalyzer:
     """Sentiment analyzer using BERT"""
 
+    label_to_score = {
+        "1 star": -1.0,
+        "2 stars": -0.5,
+        "3 stars": 0.0,
+        "4 stars": 0.5,
+        "5 stars": 1.0
+    }
+
+    labels = ("positive", "negative", "neutral")
+
+    # Set when the model is compiled for a fixed set of (BUCKET_SIZE, SEQ_BUCKETS) shapes
+    _fixed_shapes = False
+
     def __init__(self):
-        self.device = 0 if torch.cuda.is_available() else -1
-        logger.info(f"🔧 Using device: {'GPU' if self.device == 0 else 'CPU'}")
-        
-        logger.info("📥 Loading sentiment model...")
-        self.analyzer = pipeline(
-            "sentiment-analysis",
-            model="nlptown/bert-base-multilingual-uncased-sentiment",
+        import torch
+
+        if TRITON_URL:
+            # Inference happens on the server; only tokenization and scoring run here
+            from transformers import AutoTokenizer
+
+            self.device = torch.device('cpu')
+            logger.info(f"🔌 Using Triton Inference Server: {TRITON_URL}")
+            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
+            self.model = TritonSentimentModel(TRITON_URL, TRITON_MODEL)
+        else:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            logger.info(f"🔧 Using device: {'GPU' if self.device.type == 'cuda' else 'CPU'}")
+            
+            logger.info("📥 Loading sentiment model...")
+            try:
+                self.tokenizer, self.model = self._load_onnx_model()
+            except Exception as e:
+                logger.warning(f"⚠️ ONNX Runtime unavailable, using PyTorch model: {e}")
+                self.tokenizer, self.model = self._load_torch_model()
+
+        # Star score per class index, so the expected score is a single dot product
+        id2label = self.model.config.id2label
+        self._star_scores = torch.tensor(
+            [self.label_to_score.get(id2label[i], 0.0) for i in range(len(id2label))],
             device=self.device
         )
         logger.info("✅ Model loaded!")
 
+        self._warm_up()
+
+    def _load_torch_model(self):
+        """
+        Load the PyTorch model for the current device
+        
+        GPU runs in half precision so matmuls hit Tensor Cores, compiled
+        for the static shapes in SEQ_BUCKETS. CPU runs with dynamically
+        quantized INT8 Linear layers, cached under CACHE_DIR so
+        quantization only happens once.
+        """
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
+
+        if self.device.type == 'cuda':
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.set_float32_matmul_precision('high')
+            model = AutoModelForSequenceClassification.from_pretrained(
+                MODEL_NAME, torch_dtype=torch.float16
+            )
+            # reduce-overhead records a CUDA graph per input shape and replays it; buckets
+            # are padded to BUCKET_SIZE x SEQ_BUCKETS so there are only a few to capture
+            model = torch.compile(model.to(self.device).eval(), mode="reduce-overhead", dynamic=False)
+            self._fixed_shapes = True
+            return tokenizer, model
+
+        from transformers import AutoConfig
+
+        int8_path = os.path.join(CACHE_DIR, 'model_int8.pt')
+
+        if os.path.isfile(int8_path):
+            logger.info(f"📦 Loading cached INT8 model from {int8_path}")
+            model = AutoModelForSequenceClassification.from_config(
+                AutoConfig.from_pretrained(MODEL_NAME)
+            )
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.load_state_dict(torch.load(int8_path))
+        else:
+            logger.info("🛠️ Quantizing sentiment model to INT8...")
+            model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            torch.save(model.state_dict(), int8_path)
+
+        return tokenizer, model.eval()
+
+    def _load_onnx_model(self):
+        """
+        Load the model as an ONNX Runtime session
+        
+        The ONNX export is cached under CACHE_DIR so it only runs once per
+        volume. On GPU the TensorRT execution provider compiles an FP16
+        engine with an explicit optimization profile (batch 1..BUCKET_SIZE,
+        sequence 8..MAX_LENGTH) and caches it next to the export. On CPU
+        the export is dynamically quantized to INT8 (VNNI kernels where the
+        CPU has them), also cached under CACHE_DIR.
+        """
+        from transformers import AutoTokenizer
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        onnx_dir = os.path.join(CACHE_DIR, 'sentiment-onnx')
+
+        if os.path.isdir(onnx_dir):
+            logger.info(f"📦 Loading cached ONNX model from {onnx_dir}")
+            tokenizer = AutoTokenizer.from_pretrained(onnx_dir, use_fast=True)
+        else:
+            logger.info("🛠️ Exporting sentiment model to ONNX...")
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, use_fast=True)
+            ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True).save_pretrained(onnx_dir)
+            tokenizer.save_pretrained(onnx_dir)
+
+        if self.device.type == 'cuda':
+            model = ORTModelForSequenceClassification.from_pretrained(
+                onnx_dir,
+                provider="TensorrtExecutionProvider",
+                provider_options={
+                    "trt_fp16_enable": True,
+                    "trt_engine_cache_enable": True,
+                    "trt_engine_cache_path": os.path.join(CACHE_DIR, 'sentiment-trt'),
+                    # One engine covering every bucket shape instead of a rebuild per new shape
+                    "trt_profile_min_shapes": _trt_shapes(1, 8),
+                    "trt_profile_opt_shapes": _trt_shapes(BUCKET_SIZE, 128),
+                    "trt_profile_max_shapes": _trt_shapes(BUCKET_SIZE, MAX_LENGTH)
+                }
+            )
+            return tokenizer, model
+
+        int8_dir = os.path.join(CACHE_DIR, 'sentiment-onnx-int8')
+
+        if not os.path.isdir(int8_dir):
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+            if _cpu_has('avx512_vnni'):
+                qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            else:
+                qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+            logger.info("🛠️ Quantizing ONNX model to INT8...")
+            ORTQuantizer.from_pretrained(onnx_dir).quantize(save_dir=int8_dir, quantization_config=qconfig)
+            tokenizer.save_pretrained(int8_dir)
+
+        logger.info(f"📦 Loading INT8 ONNX model from {int8_dir}")
+        model = ORTModelForSequenceClassification.from_pretrained(
+            int8_dir, file_name="model_quantized.onnx", provider="CPUExecutionProvider"
+        )
+        return tokenizer, model
+
+    def _warm_up(self):
+        """
+        Run dummy buckets through the model
+        
+        A compiled model sees one bucket of every shape it will be padded
+        to; other backends see the largest shape. Compilation, CUDA graph
+        capture and TensorRT engine builds happen here instead of while the
+        first real batch is waiting to be acked.
+        """
+        import torch
+
+        logger.info("🔥 Warming up model...")
+        seq_lengths = SEQ_BUCKETS if self._fixed_shapes else (MAX_LENGTH,)
+        with torch.inference_mode():
+            for seq_len in seq_lengths:
+                input_ids = torch.zeros(BUCKET_SIZE, seq_len, dtype=torch.long, device=self.device)
+                self.model(input_ids=input_ids, attention_mask=torch.ones_like(input_ids))
+
     def analyze(self, text: str, rating: int) -> dict:
         """Analyze sentiment"""
+        return self.analyze_batch([text], [rating])[0]
+
+    def analyze_batch(self, texts: list, ratings: list) -> list:
+        """
+        Analyze sentiment of several reviews in length-bucketed forward passes
+        
+        Reviews are tokenized once, sorted by token length and run in
+        sub-batches of BUCKET_SIZE, so each sub-batch is only padded to its
+        own longest review instead of the longest review in the whole batch.
+        
+        Args:
+            texts: Review texts
+            ratings: Star ratings, aligned with texts
+        
+        Returns:
+            list: One sentiment dict per review, in input order
+        """
+        import torch
+
         try:
-            text_truncated = text[:512]
+            encoded = self.tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+            input_ids = encoded['input_ids']
+            attention_mask = encoded['attention_mask']
+            order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
             
-            result = self.analyzer(text_truncated)[0]
-            
-            label_to_score = {
-                "1 star": -1.0,
-                "2 stars": -0.5,
-                "3 stars": 0.0,
-                "4 stars": 0.5,
-                "5 stars": 1.0
-            }
-            
-            model_score = label_to_score.get(result['label'], 0.0)
-            rating_score = (rating - 3) / 2
-            final_score = (model_score * 0.6) + (rating_score * 0.4)
-
-            if final_score > 0.3:
-                label = "positive"
-            elif final_score < -0.3:
-                label = "negative"
-            else:
-                label = "neutral"
-            
-            return {
-                'sentiment_score': round(final_score, 3),
-                'sentiment_label': label
-            }
+            with torch.inference_mode():
+                model_scores = torch.empty(len(texts), device=self.device)
+                for start in range(0, len(order), BUCKET_SIZE):
+                    bucket = order[start:start + BUCKET_SIZE]
+                    features = {
+                        'input_ids': [input_ids[i] for i in bucket],
+                        'attention_mask': [attention_mask[i] for i in bucket]
+                    }
+
+                    if self._fixed_shapes:
+                        logits = self._run_fixed_shape(features, len(input_ids[bucket[-1]]))
+                    else:
+                        batch = self.tokenizer.pad(
+                            features,
+                            padding='longest',
+                            # Sequence lengths divisible by 8 keep FP16 matmuls on Tensor Cores
+                            pad_to_multiple_of=8,
+                            return_tensors='pt'
+                        ).to(self.device)
+                        logits = self.model(**batch).logits
+
+                    # Scatter back to input order so callers can zip with delivery tags
+                    model_scores[torch.tensor(bucket, device=self.device)] = (
+                        logits.float().softmax(-1) @ self._star_scores
+                    )
+
+                # Blend with the star rating and classify the whole batch at once
+                ratings_t = torch.as_tensor(ratings, device=self.device, dtype=torch.float32)
+                final = 0.6 * model_scores + 0.4 * (ratings_t - 3) / 2
+                label_ids = torch.where(final > 0.3, 0, torch.where(final < -0.3, 1, 2))
+
+            return [
+                {'sentiment_score': round(score, 3), 'sentiment_label': self.labels[label_id]}
+                for score, label_id in zip(final.tolist(), label_ids.tolist())
+            ]
             
         except Exception as e:
             logger.error(f"❌ Analysis failed: {e}")
-            rating_score = (rating - 3) / 2
-            label = "positive" if rating >= 4 else "negative" if rating <= 2 else "neutral"
-            return {'sentiment_score': round(rating_score, 3), 'sentiment_label': label}
+            return [self._fallback(rating) for rating in ratings]
+
+    def _run_fixed_shape(self, features, longest):
+        """Pad a bucket to BUCKET_SIZE rows and the next SEQ_BUCKETS length, return its logits"""
+        import torch
+
+        seq_len = next(length for length in SEQ_BUCKETS if length >= longest)
+        batch = self.tokenizer.pad(
+            features, padding='max_length', max_length=seq_len, return_tensors='pt'
+        ).to(self.device)
+
+        rows = len(features['input_ids'])
+        if rows < BUCKET_SIZE:
+            batch = {
+                name: torch.nn.functional.pad(tensor, (0, 0, 0, BUCKET_SIZE - rows))
+                for name, tensor in batch.items()
+            }
+
+        return self.model(**batch).logits[:rows]
+
+    def _fallback(self, rating: int) -> dict:
+        """Rating-only sentiment used when the model fails (neutral if the rating is unusable)"""
+        if isinstance(rating, bool) or not isinstance(rating, (int, float)):
+            return {'sentiment_score': 0.0, 'sentiment_label': 'neutral'}
+        rating_score = (rating - 3) / 2
+        label = "positive" if rating >= 4 else "negative" if rating <= 2 else "neutral"
+        return {'sentiment_score': round(rating_score, 3), 'sentiment_label': label}
+
+
+def _cpu_has(flag: str) -> bool:
+    """Whether /proc/cpuinfo lists the given CPU flag (False where it can't be read)"""
+    try:
+        with open('/proc/cpuinfo') as cpuinfo:
+            return any(line.startswith('flags') and flag in line.split() for line in cpuinfo)
+    except OSError:
+        return False
+
+
+def _trt_shapes(batch: int, seq_len: int) -> str:
+    """TensorRT profile shape string giving every model input the same batch x sequence shape"""
+    return ','.join(f"{name}:{batch}x{seq_len}" for name in TritonSentimentModel.INPUT_NAMES)
+
+
+class TritonSentimentModel:
+    """
+    Client for the sentiment model served by Triton Inference Server
+    
+    Exposes the part of the Hugging Face model interface SentimentAnalyzer
+    relies on (``config`` and ``model(**batch).logits``), so bucketing and
+    scoring are shared with the local backends. Triton's dynamic batcher
+    coalesces buckets sent by every worker process onto the GPUs.
+    """
+
+    # Inputs of the ONNX export, as declared in model_repository/sentiment/config.pbtxt
+    INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+    def __init__(self, url: str, model_name: str):
+        import tritonclient.grpc as grpcclient
+        from transformers import AutoConfig
+
+        self._grpc = grpcclient
+        self.client = grpcclient.InferenceServerClient(url=url)
+        self.model_name = model_name
+        self.config = AutoConfig.from_pretrained(MODEL_NAME)
+        self._outputs = [grpcclient.InferRequestedOutput('logits')]
+
+    def __call__(self, **inputs):
+        import torch
+        from types import SimpleNamespace
+
+        infer_inputs = self._infer_inputs({name: tensor.numpy() for name, tensor in inputs.items()})
+
+        result = self.client.infer(self.model_name, inputs=infer_inputs, outputs=self._outputs)
+        return SimpleNamespace(logits=torch.from_numpy(result.as_numpy('logits')))
+
+    def _infer_inputs(self, arrays):
+        """Build one InferInput per model input from the padded numpy arrays"""
+        import numpy as np
+
+        # Triton requires every declared input; reviews are a single segment, so all zeros
+        if 'token_type_ids' not in arrays:
+            arrays['token_type_ids'] = np.zeros_like(arrays['input_ids'])
+
+        infer_inputs = []
+        for name in self.INPUT_NAMES:
+            array = arrays[name]
+            infer_input = self._grpc.InferInput(name, list(array.shape), "INT64")
+            infer_input.set_data_from_numpy(array)
+            infer_inputs.append(infer_input)
+        return infer_inputs
         
 # Global instance
 _analyzer = None
+_analyzer_lock = threading.Lock()
 
 def get_analyzer():
     global _analyzer
     if _analyzer is None:
-        _analyzer = SentimentAnalyzer()
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = SentimentAnalyzer()
     return _analyzer
+
+def preload_analyzer():
+    """Load the model in a background thread"""
+    thread = threading.Thread(target=get_analyzer, name='model-preload', daemon=True)
+    thread.start()
+    return thread
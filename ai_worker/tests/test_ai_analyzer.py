@@ -0,0 +1,68 @@
+import os
+import re
+from types import SimpleNamespace
+
+import numpy as np
+
+from ai_analyzer import TritonSentimentModel, _trt_shapes
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'model_repository', 'sentiment', 'config.pbtxt'
+)
+
+
+class FakeInferInput:
+    """Records what the client would send to Triton"""
+
+    def __init__(self, name, shape, datatype):
+        self.name = name
+        self.shape = shape
+        self.datatype = datatype
+        self.data = None
+
+    def set_data_from_numpy(self, array):
+        self.data = array
+
+
+def _config_input_names():
+    """Input names declared in the input [...] block of config.pbtxt"""
+    with open(CONFIG_PATH) as config:
+        text = config.read()
+    block = re.search(r'^input \[(.*?)^\]', text, re.S | re.M).group(1)
+    return re.findall(r'name: "(\w+)"', block)
+
+
+def _model():
+    model = TritonSentimentModel.__new__(TritonSentimentModel)
+    model._grpc = SimpleNamespace(InferInput=FakeInferInput)
+    return model
+
+
+def test_client_sends_every_input_in_config():
+    input_ids = np.array([[101, 2023, 102, 0]], dtype=np.int64)
+    attention_mask = np.array([[1, 1, 1, 0]], dtype=np.int64)
+
+    infer_inputs = _model()._infer_inputs({'input_ids': input_ids, 'attention_mask': attention_mask})
+
+    assert [infer_input.name for infer_input in infer_inputs] == _config_input_names()
+    for infer_input in infer_inputs:
+        assert infer_input.shape == [1, 4]
+        assert infer_input.datatype == "INT64"
+
+
+def test_missing_token_type_ids_are_zero_filled():
+    input_ids = np.array([[101, 2023, 102]], dtype=np.int64)
+    attention_mask = np.ones_like(input_ids)
+
+    infer_inputs = _model()._infer_inputs({'input_ids': input_ids, 'attention_mask': attention_mask})
+    token_type_ids = {infer_input.name: infer_input for infer_input in infer_inputs}['token_type_ids']
+
+    assert token_type_ids.data.dtype == np.int64
+    assert not token_type_ids.data.any()
+
+
+def test_trt_profile_covers_every_input():
+    shapes = dict(entry.split(':') for entry in _trt_shapes(8, 512).split(','))
+
+    assert list(shapes) == _config_input_names()
+    assert set(shapes.values()) == {'8x512'}
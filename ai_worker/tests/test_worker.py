@@ -0,0 +1,114 @@
+import urllib.error
+from types import SimpleNamespace
+
+import pytest
+from pika.spec import Basic
+
+from ai_analyzer import SentimentAnalyzer
+import worker
+from worker import MAX_ATTEMPTS, REJECT, ReviewBatcher, process_reviews, validate_review_message
+
+
+class FakeChannel:
+    """Records publishes and acks instead of talking to RabbitMQ"""
+
+    def __init__(self):
+        self.published = []
+        self.acked = []
+        self.nacked = []
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        self.published.append(body)
+
+    def basic_ack(self, delivery_tag):
+        self.acked.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue):
+        self.nacked.append((delivery_tag, requeue))
+
+
+def _message(**fields):
+    message = {'event_type': 'ReviewCreated', 'review_id': 1, 'hotel_id': 2, 'rating': 4, 'content': 'Lovely stay'}
+    message.update(fields)
+    return message
+
+
+def test_valid_messages_pass():
+    assert validate_review_message(_message()) is None
+    assert validate_review_message(_message(content=None, content_ref='reviews/1')) is None
+
+
+@pytest.mark.parametrize('message', [
+    _message(rating=None),
+    _message(rating='5'),
+    _message(rating=True),
+    _message(rating=9),
+    _message(content=None),
+    _message(content=42),
+    ['not', 'an', 'object'],
+])
+def test_invalid_messages_are_rejected(message):
+    assert validate_review_message(message)
+
+
+def test_fallback_tolerates_unusable_ratings():
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+
+    assert [analyzer._fallback(rating) for rating in (5, None, 1)] == [
+        {'sentiment_score': 1.0, 'sentiment_label': 'positive'},
+        {'sentiment_score': 0.0, 'sentiment_label': 'neutral'},
+        {'sentiment_score': -1.0, 'sentiment_label': 'negative'},
+    ]
+
+
+def test_reviews_are_acked_when_their_results_are_confirmed():
+    channel = FakeChannel()
+    batcher = ReviewBatcher(connection=None, channel=channel)
+    batch = [(tag, _message(review_id=tag)) for tag in (11, 12, 13, 14)]
+    result = {'sentiment_score': 0.5, 'sentiment_label': 'positive'}
+
+    batcher._settle(batch, [result, None, result, result])
+
+    # Published without waiting; the failed review is requeued straight away
+    assert len(channel.published) == 3
+    assert channel.nacked == [(12, True)]
+    assert channel.acked == []
+
+    batcher.on_confirm(SimpleNamespace(method=Basic.Ack(delivery_tag=2, multiple=True)))
+    assert channel.acked == [11, 13]
+
+    batcher.on_confirm(SimpleNamespace(method=Basic.Nack(delivery_tag=3)))
+    assert channel.nacked == [(12, True), (14, True)]
+    assert batcher.unconfirmed == {}
+
+
+def test_missing_claimed_content_is_rejected(monkeypatch):
+    def urlopen(url, timeout):
+        raise urllib.error.HTTPError(url, 404, 'NOT FOUND', None, None)
+
+    monkeypatch.setattr(worker.urllib.request, 'urlopen', urlopen)
+
+    assert process_reviews([_message(content=None, content_ref='reviews/1')]) == [REJECT]
+
+
+def test_unreachable_claimed_content_is_retried(monkeypatch):
+    def urlopen(url, timeout):
+        raise urllib.error.URLError('connection refused')
+
+    monkeypatch.setattr(worker.urllib.request, 'urlopen', urlopen)
+
+    assert process_reviews([_message(content=None, content_ref='reviews/1')]) == [None]
+
+
+def test_failing_review_is_dropped_after_max_attempts():
+    channel = FakeChannel()
+    batcher = ReviewBatcher(connection=None, channel=channel)
+
+    for delivery_tag in range(1, MAX_ATTEMPTS + 1):
+        batcher._settle([(delivery_tag, _message())], [None])
+
+    assert channel.nacked == [(tag, True) for tag in range(1, MAX_ATTEMPTS)] + [(MAX_ATTEMPTS, False)]
+    assert batcher.failures == {}
+
+    batcher._settle([(99, _message())], [REJECT])
+    assert channel.nacked[-1] == (99, False)
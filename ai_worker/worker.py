@@ -2,168 +2,451 @@ import os
 import sys
 import pika
 import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from functools import partial
 from loguru import logger
-from ai_analyzer import get_analyzer
+from ai_analyzer import get_analyzer, preload_analyzer
 
 logger.remove()
-logger.add(sys.stdout, level="INFO")
+logger.add(sys.stdout, level=os.getenv('LOG_LEVEL', 'INFO'))
+
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', '32'))
+BATCH_TIMEOUT = float(os.getenv('BATCH_TIMEOUT', '0.05'))
+# Keep the next batch buffered locally while the current one is on the model
+PREFETCH_COUNT = int(os.getenv('PREFETCH_COUNT', str(BATCH_SIZE * 2)))
+RESULT_QUEUE = 'analysis.completed'
+# Base URL for content_ref (claim-checked reviews whose content isn't in the message)
+INNSIGHT_API_URL = os.getenv('INNSIGHT_API_URL', 'http://api:5000/api/v1')
+CONTENT_FETCH_TIMEOUT = float(os.getenv('CONTENT_FETCH_TIMEOUT', '5'))
+# Deliveries of a review that may fail (e.g. API unreachable) before it is dropped
+MAX_ATTEMPTS = int(os.getenv('MAX_ATTEMPTS', '5'))
+
+# Result of a review that can never be processed (its content no longer exists)
+REJECT = object()
+
+# Same properties for every result event
+_PROPS = pika.BasicProperties(delivery_mode=2, content_type='application/json')
 
 def start_consumer():
-    """Start the consumer"""
+    """Start the consumer, reconnecting with exponential backoff"""
     rabbitmq_host = os.getenv('RABBITMQ_HOST', 'rabbitmq')
-    queue_name = 'review.created'
     
     logger.info("=" * 50)
     logger.info("🐰 Review Consumer - InnSight")
     logger.info("=" * 50)
     logger.info(f"🔌 Connecting to RabbitMQ: {rabbitmq_host}")
+
+    # Load the model while the consumer finishes setting up
+    preload_analyzer()
+
+    backoff = 1
+    while True:
+        consumer = ReviewConsumer(rabbitmq_host)
+        try:
+            consumer.run()
+        except KeyboardInterrupt:
+            logger.info("\n🛑 Stopping consumer...")
+            consumer.stop()
+            break
+
+        if consumer.was_connected:
+            backoff = 1
+        logger.warning(f"⚠️ RabbitMQ connection lost ({consumer.close_reason}), reconnecting in {backoff}s")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 30)
+
+    logger.info("👋 Consumer stopped")
+
+
+class ReviewConsumer:
+    """
+    Consumes review.created on a pika SelectConnection
     
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(host=rabbitmq_host)
-    )
-    channel = connection.channel()
-    
-    channel.queue_declare(queue=queue_name, durable=True)
-    
-    # Configure QoS (process 1 at a time)
-    channel.basic_qos(prefetch_count=1)
-
-    channel.basic_consume(
-        queue=queue_name,
-        on_message_callback=callback,
-        auto_ack=False
-    )
-    
-    logger.info(f"👂 Waiting for reviews in queue '{queue_name}'...")
-    logger.info("   Press CTRL+C to exit")
-    
-    try:
-        channel.start_consuming()
-    except KeyboardInterrupt:
-        logger.info("\n🛑 Stopping consumer...")
-        channel.stop_consuming()
+    Results are published on the consuming channel, which is in confirm
+    mode with an ack/nack callback: a batch's results are all written
+    without waiting, and each review is acked once the broker has
+    confirmed its result (the broker usually confirms a whole batch with
+    one multiple=True ack).
+    """
+
+    # Seconds stop() waits for outstanding confirms before closing
+    CLOSE_TIMEOUT = 5
+
+    def __init__(self, host):
+        self.host = host
+        self.queue_name = os.getenv('REVIEW_QUEUE_NAME', 'review.created')
+        self.connection = None
+        self.channel = None
+        self.batcher = None
+        self.was_connected = False
+        self.close_reason = None
+
+    def run(self):
+        """Connect and run the ioloop until the connection closes"""
+        self.connection = pika.SelectConnection(
+            pika.ConnectionParameters(
+                host=self.host,
+                heartbeat=30,
+                blocked_connection_timeout=300,
+                tcp_options={'TCP_KEEPIDLE': 60}
+            ),
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_error,
+            on_close_callback=self._on_connection_closed
+        )
+        self.connection.ioloop.start()
+
+    def stop(self):
+        """Finish the batch in progress, wait for its confirms, then close the connection"""
+        if self.batcher is not None:
+            self.batcher.stop()
+        if self.connection is not None and self.connection.is_open:
+            # Runs after the acks and publishes the analysis thread handed back
+            deadline = time.monotonic() + self.CLOSE_TIMEOUT
+            self.connection.ioloop.add_callback_threadsafe(partial(self._close_when_settled, deadline))
+            self.connection.ioloop.start()
+
+    def _close_when_settled(self, deadline):
+        if self.batcher.unconfirmed and time.monotonic() < deadline:
+            self.connection.ioloop.call_later(0.05, partial(self._close_when_settled, deadline))
+            return
+        # Reviews still unconfirmed stay unacked and are redelivered
+        self.connection.close()
+
+    def _on_connection_open(self, connection):
+        self.was_connected = True
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection, error):
+        self.close_reason = error
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        self.close_reason = reason
+        if self.batcher is not None:
+            # Unacked deliveries are redelivered on the next connection
+            self.batcher.stop()
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self.channel = channel
+        channel.queue_declare(
+            queue=self.queue_name,
+            durable=True,
+            callback=lambda _frame: channel.queue_declare(
+                queue=RESULT_QUEUE,
+                durable=True,
+                callback=self._on_queues_declared
+            )
+        )
+
+    def _on_queues_declared(self, _frame):
+        self.batcher = ReviewBatcher(self.connection, self.channel)
+        # Only ack a review once the broker has accepted its result
+        self.channel.confirm_delivery(
+            ack_nack_callback=self.batcher.on_confirm,
+            callback=lambda _frame: self.channel.basic_qos(
+                prefetch_count=PREFETCH_COUNT,
+                callback=self._on_qos_ok
+            )
+        )
+
+    def _on_qos_ok(self, _frame):
+        self.batcher.start()
+        self.channel.basic_consume(
+            queue=self.queue_name,
+            on_message_callback=self.batcher.on_message,
+            auto_ack=False
+        )
+
+        logger.info(f"👂 Waiting for reviews in queue '{self.queue_name}'...")
+        logger.info(f"   Batch size: {BATCH_SIZE}, timeout: {BATCH_TIMEOUT}s")
+        logger.info("   Press CTRL+C to exit")
+
+
+class ReviewBatcher:
+    """
+    Buffers delivered messages and analyzes them in batches
     
-    connection.close()
-    logger.info("👋 Consumer stopped")
+    Deliveries are handed to a single analysis thread so the connection
+    thread keeps servicing RabbitMQ while the model runs. A batch is
+    closed when it reaches BATCH_SIZE messages or when BATCH_TIMEOUT
+    seconds have passed since its first message. Publishing and acks are
+    scheduled back onto the ioloop with add_callback_threadsafe, since
+    pika channels are not thread-safe.
+    """
 
+    def __init__(self, connection, channel, batch_size=BATCH_SIZE, timeout=BATCH_TIMEOUT):
+        self.connection = connection
+        self.channel = channel
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.pending = queue.Queue()
+        # Publish sequence number -> delivery tag of the review whose result it is
+        self.unconfirmed = {}
+        # review_id -> failed attempts so far, for reviews currently being retried
+        self.failures = {}
+        self._next_tag = 1
+        self._thread = threading.Thread(target=self._run, name='review-batcher', daemon=True)
 
-def callback(ch, method, properties, body):
-    """Callback when message is received"""
-    try:
-        message = json.loads(body)
-        logger.info(f"📨 New message received!")
-
-        success = process_review(message)
-        
-        if success:
-            ch.basic_ack(delivery_tag=method.delivery_tag)
-            logger.info("✅ Message acknowledged (ACK)")
+    def start(self):
+        """Start the analysis thread"""
+        self._thread.start()
+
+    def stop(self):
+        """Finish the batch in progress and stop the analysis thread"""
+        if self._thread.is_alive():
+            self.pending.put(None)
+            self._thread.join()
+
+    def on_message(self, ch, method, properties, body):
+        """Callback when message is received"""
+        try:
+            message = json.loads(body)
+        except Exception as e:
+            logger.error(f"❌ Error decoding message: {e}")
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        # Rejected here, so a malformed message never shares a batch with valid ones
+        error = validate_review_message(message)
+        if error:
+            logger.error(f"❌ Rejecting invalid review message: {error}")
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        self.pending.put((method.delivery_tag, message))
+
+    def _run(self):
+        """Analysis thread: collect batches and analyze them"""
+        while True:
+            first = self.pending.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stopping = False
+            try:
+                while len(batch) < self.batch_size:
+                    item = self.pending.get(timeout=self.timeout)
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            started = time.perf_counter()
+            results = process_reviews([message for _, message in batch])
+            logger.info(
+                f"📨 Processed batch of {len(batch)} reviews in "
+                f"{(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+
+            try:
+                self.connection.ioloop.add_callback_threadsafe(partial(self._settle, batch, results))
+            except Exception as e:
+                # Connection is gone; the broker redelivers these unacked messages
+                logger.warning(f"⚠️ Dropping results for {len(batch)} reviews: {e}")
+
+            if stopping:
+                return
+
+    def _settle(self, batch, results):
+        """ioloop: publish results without waiting for confirms, requeue failed reviews"""
+        published = 0
+        for (delivery_tag, message), result in zip(batch, results):
+            review_id = message.get('review_id')
+            if result is REJECT:
+                self.failures.pop(review_id, None)
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=False)
+                logger.error(f"❌ Review {review_id} can't be processed, message rejected")
+            elif result is not None and self._publish_result(review_id, result):
+                self.failures.pop(review_id, None)
+                self.unconfirmed[self._next_tag] = delivery_tag
+                self._next_tag += 1
+                published += 1
+            elif self._give_up(review_id):
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=False)
+                logger.error(f"❌ Processing failed {MAX_ATTEMPTS} times for review {review_id}, message rejected")
+            else:
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+                logger.warning(f"⚠️ Processing failed for review {review_id}, message requeued")
+
+        logger.debug("📤 Published {} results to '{}' queue", published, RESULT_QUEUE)
+
+    def _give_up(self, review_id):
+        """Count a failed attempt, True once the review has used up MAX_ATTEMPTS"""
+        attempts = self.failures.pop(review_id, 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            return True
+        # Reinserted so the oldest entries come first; those stop being tracked past the cap
+        self.failures[review_id] = attempts
+        if len(self.failures) > PREFETCH_COUNT * MAX_ATTEMPTS:
+            self.failures.pop(next(iter(self.failures)))
+        return False
+
+    def _publish_result(self, review_id, analysis_result):
+        """Write one AnalysisCompleted event to the channel"""
+        event = {
+            'event_type': 'AnalysisCompleted',
+            'review_id': review_id,
+            'data': analysis_result
+        }
+
+        try:
+            self.channel.basic_publish(
+                exchange='',
+                routing_key=RESULT_QUEUE,
+                body=json.dumps(event),
+                properties=_PROPS
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to publish result for review {review_id}: {e}")
+            return False
+
+    def on_confirm(self, frame):
+        """ioloop: settle the reviews whose results the broker confirmed (or rejected)"""
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        if method.multiple:
+            tags = [tag for tag in self.unconfirmed if tag <= method.delivery_tag]
         else:
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-            logger.warning("⚠️ Processing failed, message requeued")
-            
-    except Exception as e:
-        logger.error(f"❌ Error processing message: {e}")
-        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            tags = [method.delivery_tag]
 
-def process_review(review_data):
+        for tag in tags:
+            delivery_tag = self.unconfirmed.pop(tag, None)
+            if delivery_tag is None:
+                continue
+            if acked:
+                self.channel.basic_ack(delivery_tag=delivery_tag)
+            else:
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+                logger.warning("⚠️ Broker rejected a result, review message requeued")
+
+        if acked:
+            logger.debug("✅ {} reviews acknowledged (ACK)", len(tags))
+
+def validate_review_message(message):
     """
-    Process review with AI analysis (NO database access)
+    Check that a ReviewCreated message can be analyzed
     
     Args:
-        review_data: Review data from queue
+        message: Decoded message body
     
     Returns:
-        bool: True if processed successfully
+        str: What is wrong with the message, or None if it is valid
     """
-    review_id = review_data.get('review_id')
-    title = review_data.get('title')
-    content = review_data.get('content')
-    rating = review_data.get('rating')
-    
-    try:
-        logger.info(f"🔄 Processing review {review_id}")
-        logger.info(f"   Title: {title}...")
-        logger.info(f"   Content: {content[:100]}...")
-        logger.info(f"   Rating: {rating} stars")
+    if not isinstance(message, dict):
+        return "message is not an object"
 
-        analyzer = get_analyzer()
+    rating = message.get('rating')
+    if isinstance(rating, bool) or not isinstance(rating, int) or not 1 <= rating <= 5:
+        return f"review {message.get('review_id')} has invalid rating {rating!r}"
 
-        logger.info("🔍 Analyzing sentiment...")
-        sentiment = analyzer.analyze(content, rating)
-        
-        logger.info(f"✅ Analysis complete!")
-        logger.info(f"   Sentiment: {sentiment['sentiment_label']} ({sentiment['sentiment_score']})")
+    content = message.get('content')
+    if content is None:
+        if not isinstance(message.get('content_ref'), str):
+            return f"review {message.get('review_id')} has neither content nor content_ref"
+    elif not isinstance(content, str):
+        return f"review {message.get('review_id')} has non-text content"
 
-        result = {
-            'sentiment_score': sentiment['sentiment_score'],
-            'sentiment_label': sentiment['sentiment_label'],
-            # TODO: Add more analysis later
-            'aspects': None,
-            'topics': None,
-            'key_phrases': None
-        }
-        
-        # Publish result to queue
-        success = publish_result(review_id, result)
-        
-        if success:
-            logger.info(f"✅ Review {review_id} processed and result published!")
-            return True
-        else:
-            logger.error(f"❌ Failed to publish result for review {review_id}")
-            return False
-            
-    except Exception as e:
-        logger.error(f"❌ Error processing review {review_id}: {e}")
-        logger.exception("Full traceback:")
-        return False
-    
-def publish_result(review_id, analysis_result):
+    return None
+
+def fetch_claimed_content(review_data):
     """
-    Publish analysis result back to RabbitMQ
+    Fill in the content of a claim-checked review from the API
+    
+    Large reviews are published without their content; content_ref is
+    the review's path under the API instead. On a transient error the
+    content stays None so the review is retried.
     
     Args:
-        review_id: Review ID
-        analysis_result: AI analysis results
+        review_data: Review data from queue (updated in place)
     
     Returns:
-        bool: True if published successfully
+        bool: False if the review no longer exists (404), True otherwise
     """
+    url = f"{INNSIGHT_API_URL}/{review_data['content_ref']}"
     try:
-        rabbitmq_host = os.getenv('RABBITMQ_HOST', 'rabbitmq')
+        with urllib.request.urlopen(url, timeout=CONTENT_FETCH_TIMEOUT) as response:
+            review_data['content'] = json.load(response).get('content')
+    except urllib.error.HTTPError as e:
+        logger.error(f"❌ Error fetching content of review {review_data.get('review_id')}: {e}")
+        return e.code != 404
+    except Exception as e:
+        logger.error(f"❌ Error fetching content of review {review_data.get('review_id')}: {e}")
+    return True
 
-        connection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=rabbitmq_host)
-        )
-        channel = connection.channel()
+def process_reviews(reviews_data):
+    """
+    Process a batch of reviews with AI analysis (NO database access)
+    
+    Args:
+        reviews_data: List of review data from queue
+    
+    Returns:
+        list: Analysis result per review, None where analysis failed, or
+        REJECT where the review's content no longer exists
+    """
+    results = [None] * len(reviews_data)
 
-        result_queue = 'analysis.completed'
-        channel.queue_declare(queue=result_queue, durable=True)
+    for index, review_data in enumerate(reviews_data):
+        if review_data.get('content') is None and review_data.get('content_ref'):
+            if not fetch_claimed_content(review_data):
+                results[index] = REJECT
 
-        event = {
-            'event_type': 'AnalysisCompleted',
-            'review_id': review_id,
-            'data': analysis_result
-        }
+    # Reviews whose content couldn't be fetched keep a None (or REJECT) result
+    indexes = [index for index, review_data in enumerate(reviews_data) if review_data.get('content') is not None]
+    if not indexes:
+        return results
+    reviews_data = [reviews_data[index] for index in indexes]
 
-        channel.basic_publish(
-            exchange='',
-            routing_key=result_queue,
-            body=json.dumps(event),
-            properties=pika.BasicProperties(
-                delivery_mode=2,
-                content_type='application/json'
+    try:
+        for review_data in reviews_data:
+            # Lazy so the content slice is only built when DEBUG is enabled
+            logger.opt(lazy=True).debug(
+                "🔄 Processing review {} (rating {}): {}...",
+                lambda: review_data.get('review_id'),
+                lambda: review_data.get('rating'),
+                lambda: review_data.get('content')[:100]
             )
+
+        analyzer = get_analyzer()
+
+        sentiments = analyzer.analyze_batch(
+            [review_data.get('content') for review_data in reviews_data],
+            [review_data.get('rating') for review_data in reviews_data]
         )
-        
-        logger.info(f"📤 Published result to '{result_queue}' queue")
-        connection.close()
-        return True
-        
+
     except Exception as e:
-        logger.error(f"❌ Failed to publish result: {e}")
-        return False
+        logger.error(f"❌ Error processing batch: {e}")
+        logger.exception("Full traceback:")
+        return results
 
+    for index, review_data, sentiment in zip(indexes, reviews_data, sentiments):
+        logger.debug(
+            "   Review {}: {} ({})",
+            review_data.get('review_id'),
+            sentiment['sentiment_label'],
+            sentiment['sentiment_score']
+        )
+
+        results[index] = {
+            'sentiment_score': sentiment['sentiment_score'],
+            'sentiment_label': sentiment['sentiment_label'],
+            # TODO: Add more analysis later
+            'aspects': None,
+            'topics': None,
+            'key_phrases': None
+        }
+
+    return results
+    
 if __name__ == '__main__':
-    start_consumer()
\ No newline at end of file
+    start_consumer()
@@ -2,15 +2,16 @@ import logging
 import random
 from flask import Flask, jsonify
 from werkzeug.exceptions import HTTPException
-from sqlalchemy import inspect
+from sqlalchemy import inspect, insert, literal, select
 
 from config import get_config
-from extensions import init_extensions, db
+from extensions import OrjsonProvider, init_extensions, db
 from routes.health_bp import health_bp
 from routes.hotels_bp import hotels_bp
 from routes.reviews_bp import reviews_bp
 from models.hotel import Hotel
-from models.review import Review, ReviewStatus
+from models.review import ReviewStatus
+from repository.reviews_repository import ReviewRepository
 
 
 def create_app(config_name=None):
@@ -24,6 +25,7 @@ def create_app(config_name=None):
         Configured Flask application
     """
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     config = get_config(config_name)
     app.config.from_object(config)
@@ -129,35 +131,29 @@ def ensure_database_setup(app):
         app: Flask application instance
     """
     with app.app_context():
-        inspector = inspect(db.engine)
-        existing_tables = inspector.get_table_names()
+        with db.engine.connect() as connection:
+            has_hotels = inspect(connection).has_table('hotels')
         
-        app.logger.info(f"📊 Existing database tables: {existing_tables}")
+        app.logger.info(f"📊 Hotels table present: {has_hotels}")
         
-        if 'hotels' not in existing_tables:
-            _create_tables(app, inspector)
+        if not has_hotels:
+            _create_tables(app)
         else:
             _check_and_seed_data(app)
 
-def _create_tables(app, inspector):
+def _create_tables(app):
     """
     Create database tables.
     
     Args:
         app: Flask application instance
-        inspector: SQLAlchemy inspector instance
     """
     app.logger.info("Tables not found. Creating database schema...")
 
     try:
+        # create_all raises if any table cannot be created
         db.create_all()
-        
-        new_inspector = inspect(db.engine)
-        new_tables = new_inspector.get_table_names()
-        app.logger.info(f"Successfully created tables: {new_tables}")
-        
-        if 'hotels' not in new_tables:
-            raise Exception("Failed to create 'hotels' table")
+        app.logger.info(f"Successfully created tables: {list(db.metadata.tables)}")
         
         # Seed initial data
         _seed_sample_data(app)
@@ -174,10 +170,11 @@ def _check_and_seed_data(app):
         app: Flask application instance
     """
     try:
-        hotel_count = db.session.query(Hotel).count()
-        app.logger.info(f"Found {hotel_count} hotels in database")
+        has_hotels = db.session.execute(
+            select(literal(1)).select_from(Hotel).limit(1)
+        ).first() is not None
         
-        if hotel_count == 0:
+        if not has_hotels:
             app.logger.info("Database is empty. Seeding initial data...")
             _seed_sample_data(app)
         else:
@@ -189,66 +186,66 @@ def _check_and_seed_data(app):
 
 def _seed_sample_data(app):
     """Seed database with sample hotels"""
-    from sqlalchemy import text
-    
     try:
         db.session.rollback()
         
-        hotels = [
+        hotel_rows = [
             # US Hotels
-            Hotel(name="Grand Plaza Hotel", city="New York", country="USA",
-                  address="123 Main St, NY 10001", 
-                  description="Luxury hotel in the heart of Manhattan", star_rating=4.5),
-            Hotel(name="Seaside Resort", city="Miami", country="USA",
-                  address="456 Ocean Drive, Miami 33139", 
-                  description="Beautiful beachfront resort", star_rating=4.0),
-            Hotel(name="Mountain View Lodge", city="Denver", country="USA",
-                  address="789 Alpine Rd, Denver 80202", 
-                  description="Cozy mountain retreat", star_rating=3.5),
-            Hotel(name="Downtown Business Hotel", city="Chicago", country="USA",
-                  address="321 Commerce Blvd, Chicago 60601", 
-                  description="Modern business hotel", star_rating=4.0),
-            Hotel(name="Historic Inn", city="Boston", country="USA",
-                  address="555 Heritage Lane, Boston 02101", 
-                  description="Charming historic inn", star_rating=3.8),
+            dict(name="Grand Plaza Hotel", city="New York", country="USA",
+                 address="123 Main St, NY 10001",
+                 description="Luxury hotel in the heart of Manhattan", star_rating=4.5),
+            dict(name="Seaside Resort", city="Miami", country="USA",
+                 address="456 Ocean Drive, Miami 33139",
+                 description="Beautiful beachfront resort", star_rating=4.0),
+            dict(name="Mountain View Lodge", city="Denver", country="USA",
+                 address="789 Alpine Rd, Denver 80202",
+                 description="Cozy mountain retreat", star_rating=3.5),
+            dict(name="Downtown Business Hotel", city="Chicago", country="USA",
+                 address="321 Commerce Blvd, Chicago 60601",
+                 description="Modern business hotel", star_rating=4.0),
+            dict(name="Historic Inn", city="Boston", country="USA",
+                 address="555 Heritage Lane, Boston 02101",
+                 description="Charming historic inn", star_rating=3.8),
             
             # European Hotels
-            Hotel(name="Royal Palace Hotel", city="London", country="UK",
-                  address="10 Buckingham Road, London SW1A 1AA",
-                  description="Elegant hotel near royal landmarks", star_rating=5.0),
-            Hotel(name="Seine View Hotel", city="Paris", country="France",
-                  address="25 Rue de Rivoli, Paris 75001",
-                  description="Boutique hotel with Eiffel Tower views", star_rating=4.7),
-            Hotel(name="Berlin Central Hotel", city="Berlin", country="Germany",
-                  address="15 Unter den Linden, Berlin 10117",
-                  description="Modern hotel in city center", star_rating=4.2),
-            Hotel(name="Rome Heritage Hotel", city="Rome", country="Italy",
-                  address="88 Via del Corso, Rome 00186",
-                  description="Classic Italian hotel near Colosseum", star_rating=4.5),
-            Hotel(name="Barcelona Beach Resort", city="Barcelona", country="Spain",
-                  address="42 Passeig de Gracia, Barcelona 08007",
-                  description="Mediterranean resort with beach access", star_rating=4.3),
+            dict(name="Royal Palace Hotel", city="London", country="UK",
+                 address="10 Buckingham Road, London SW1A 1AA",
+                 description="Elegant hotel near royal landmarks", star_rating=5.0),
+            dict(name="Seine View Hotel", city="Paris", country="France",
+                 address="25 Rue de Rivoli, Paris 75001",
+                 description="Boutique hotel with Eiffel Tower views", star_rating=4.7),
+            dict(name="Berlin Central Hotel", city="Berlin", country="Germany",
+                 address="15 Unter den Linden, Berlin 10117",
+                 description="Modern hotel in city center", star_rating=4.2),
+            dict(name="Rome Heritage Hotel", city="Rome", country="Italy",
+                 address="88 Via del Corso, Rome 00186",
+                 description="Classic Italian hotel near Colosseum", star_rating=4.5),
+            dict(name="Barcelona Beach Resort", city="Barcelona", country="Spain",
+                 address="42 Passeig de Gracia, Barcelona 08007",
+                 description="Mediterranean resort with beach access", star_rating=4.3),
             
             # Asian Hotels
-            Hotel(name="Tokyo Tower Hotel", city="Tokyo", country="Japan",
-                  address="1-1-1 Shibuya, Tokyo 150-0002",
-                  description="High-tech hotel in heart of Tokyo", star_rating=4.6),
-            Hotel(name="Singapore Marina Hotel", city="Singapore", country="Singapore",
-                  address="10 Marina Bay, Singapore 018956",
-                  description="Luxury waterfront hotel", star_rating=4.8),
-            Hotel(name="Hong Kong Skyline Hotel", city="Hong Kong", country="China",
-                  address="88 Nathan Road, Hong Kong",
-                  description="Modern hotel with harbor views", star_rating=4.4),
-            Hotel(name="Bangkok Palace Hotel", city="Bangkok", country="Thailand",
-                  address="123 Sukhumvit Road, Bangkok 10110",
-                  description="Traditional Thai hospitality", star_rating=4.1),
-            Hotel(name="Dubai Luxury Resort", city="Dubai", country="UAE",
-                  address="1 Sheikh Zayed Road, Dubai",
-                  description="Ultra-luxury resort", star_rating=5.0),
+            dict(name="Tokyo Tower Hotel", city="Tokyo", country="Japan",
+                 address="1-1-1 Shibuya, Tokyo 150-0002",
+                 description="High-tech hotel in heart of Tokyo", star_rating=4.6),
+            dict(name="Singapore Marina Hotel", city="Singapore", country="Singapore",
+                 address="10 Marina Bay, Singapore 018956",
+                 description="Luxury waterfront hotel", star_rating=4.8),
+            dict(name="Hong Kong Skyline Hotel", city="Hong Kong", country="China",
+                 address="88 Nathan Road, Hong Kong",
+                 description="Modern hotel with harbor views", star_rating=4.4),
+            dict(name="Bangkok Palace Hotel", city="Bangkok", country="Thailand",
+                 address="123 Sukhumvit Road, Bangkok 10110",
+                 description="Traditional Thai hospitality", star_rating=4.1),
+            dict(name="Dubai Luxury Resort", city="Dubai", country="UAE",
+                 address="1 Sheikh Zayed Road, Dubai",
+                 description="Ultra-luxury resort", star_rating=5.0),
         ]
 
-        db.session.add_all(hotels)
-        db.session.flush()
+        hotel_ids = db.session.scalars(
+            insert(Hotel).returning(Hotel.id, sort_by_parameter_order=True),
+            hotel_rows
+        ).all()
 
         review_data = [
             ("Alice Johnson", 5, "Absolutely perfect!",
@@ -274,34 +271,24 @@ def _seed_sample_data(app):
         ]
         
         # Create unique reviews for each hotel (no duplicates per hotel)
-        reviews = []
-        for hotel in hotels:
+        review_rows = []
+        for hotel_id in hotel_ids:
             num_reviews = random.randint(3, 7)
 
-            shuffled_templates = review_data.copy()
-            random.shuffle(shuffled_templates)
-            selected_templates = shuffled_templates[:num_reviews]
-
-            for template in selected_templates:
-                review = Review(
-                    hotel_id=hotel.id,
-                    user_name=template[0],
-                    rating=template[1],
-                    title=template[2],
-                    content=template[3],
-                    status=ReviewStatus.PENDING
-                )
-                reviews.append(review)
+            for template in random.sample(review_data, num_reviews):
+                review_rows.append({
+                    'hotel_id': hotel_id,
+                    'user_name': template[0],
+                    'rating': template[1],
+                    'title': template[2],
+                    'content': template[3],
+                    'status': ReviewStatus.PENDING
+                })
         
-        db.session.add_all(reviews)
-        db.session.flush()
-        db.session.commit()
+        ReviewRepository(db.session).bulk_create(review_rows)
         
-        hotel_count = db.session.execute(text("SELECT COUNT(*) FROM hotels")).scalar()
-        review_count = db.session.execute(text("SELECT COUNT(*) FROM reviews")).scalar()
-
-        app.logger.info(f"✅ Successfully seeded {hotel_count} hotels")
-        app.logger.info(f"✅ Successfully seeded {review_count} hotels")
+        app.logger.info(f"✅ Successfully seeded {len(hotel_ids)} hotels")
+        app.logger.info(f"✅ Successfully seeded {len(review_rows)} reviews")
         
     except Exception as e:
         db.session.rollback()
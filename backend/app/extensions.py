@@ -1,11 +1,52 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 
-db = SQLAlchemy()
+# Keep loaded attributes after commit so repositories can return freshly
+# created/updated objects without reloading them
+db = SQLAlchemy(session_options={'expire_on_commit': False})
 migrate = Migrate()
 cors = CORS()
 
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes and decodes with orjson.
+    
+    Keeps the default provider's key sorting, debug indentation and
+    fallback conversions (dates, UUIDs, dataclasses); anything orjson
+    handles natively (datetime, Enum, ...) never reaches the fallback.
+    request.get_json() parses through loads(), so request bodies take
+    the orjson path as well.
+    """
+
+    def _options(self, pretty=False) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(
+            obj, default=self.default, option=self._options('indent' in kwargs)
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        # orjson returns bytes, so the body is sent without a decode/encode round trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._options(pretty)),
+            mimetype=self.mimetype
+        )
+
+
 def init_extensions(app):
     """
     Initialize all Flask extensions with the app instance.
@@ -15,12 +56,11 @@ def init_extensions(app):
     """
     db.init_app(app)
     migrate.init_app(app, db)
-    cors.init_app(
-        app,
-        resources={r"/api/*": {"origins": app.config.get("CORS_ORIGINS", ["*"])}}
-    )
-
-    with app.app_context():
-        import models.hotel
-        import models.review
-        app.logger.debug("Models imported and registered")
+    # Resolved once here; flask-cors reuses it for every request
+    resources = {
+        r"/api/*": {
+            "origins": list(app.config.get("CORS_ORIGINS", ["*"])),
+            "max_age": app.config.get("CORS_MAX_AGE")
+        }
+    }
+    cors.init_app(app, resources=resources)
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Any, Dict
-from sqlalchemy import DateTime
+from typing import Any, Dict, Tuple
+from sqlalchemy import DateTime, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 from extensions import db
 
@@ -17,14 +17,14 @@ class TimestampMixin:
     
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.utcnow,
+        server_default=func.now(),
         nullable=False
     )
     
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=False
     )
 
@@ -35,6 +35,12 @@ class BaseModel(Base, TimestampMixin):
     """
     
     __abstract__ = True
+
+    # Fetch server-generated timestamps with RETURNING in the same statement
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Set per model once its mapper is configured, see _cache_column_names
+    _column_names: Tuple[str, ...] = ()
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -43,18 +49,22 @@ class BaseModel(Base, TimestampMixin):
         Returns:
             Dict with all column values
         """
-        return {
-            column.name: getattr(self, column.name)
-            for column in self.__table__.columns
-        }
+        return {name: getattr(self, name) for name in self._column_names}
     
     def __repr__(self) -> str:
         """String representation of the model"""
         attrs = ", ".join(
-            f"{k}={v!r}"
-            for k, v in self.to_dict().items()
+            f"{name}={getattr(self, name)!r}"
+            for name in self._column_names
         )
         return f"{self.__class__.__name__}({attrs})"
+
+
+@event.listens_for(BaseModel, "mapper_configured", propagate=True)
+def _cache_column_names(mapper, cls):
+    """Store the table's column names on the model for to_dict()"""
+    cls._column_names = tuple(column.name for column in cls.__table__.columns)
+
     
 from .review import Review, ReviewStatus 
 from .hotel import Hotel
@@ -1,6 +1,7 @@
 from . import BaseModel
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Text, Float
+from .review import Review
+from sqlalchemy.orm import Mapped, mapped_column, relationship, column_property
+from sqlalchemy import DDL, Index, Integer, String, Text, Float, event, select, func
 from typing import Optional, List
 
 
@@ -20,6 +21,21 @@ class Hotel(BaseModel):
     """
     
     __tablename__ = "hotels"
+
+    # Trigram indexes so the substring ilike filters in HotelRepository
+    # don't fall back to a sequential scan (Postgres only, needs pg_trgm)
+    __table_args__ = (
+        Index(
+            "ix_hotels_city_trgm", "city",
+            postgresql_using="gin",
+            postgresql_ops={"city": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_hotels_country_trgm", "country",
+            postgresql_using="gin",
+            postgresql_ops={"country": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     
     # Primary Key
     id: Mapped[int] = mapped_column(
@@ -68,18 +84,29 @@ class Hotel(BaseModel):
         "Review",
         back_populates="hotel",
         cascade="all, delete-orphan",
-        lazy="select"
+        lazy="raise"
+    )
+    
+    # Counted in SQL; deferred so only queries that undefer it pay for the subquery
+    review_count: Mapped[int] = column_property(
+        select(func.count(Review.id))
+        .where(Review.hotel_id == id)
+        .correlate_except(Review)
+        .scalar_subquery(),
+        deferred=True
     )
     
     def __repr__(self) -> str:
         return f"Hotel(id={self.id}, name='{self.name}', city='{self.city}')"
     
-    @property
-    def review_count(self) -> int:
-        """Returns the total number of reviews for this hotel"""
-        return len(self.reviews) if self.reviews else 0
-    
     @property
     def location(self) -> str:
         """Returns formatted location string"""
-        return f"{self.city}, {self.country}"
\ No newline at end of file
+        return f"{self.city}, {self.country}"
+
+
+event.listen(
+    Hotel.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
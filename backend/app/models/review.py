@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import String, Integer, Float, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Index, String, Integer, Float, Text, ForeignKey, Enum as SQLEnum, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from . import BaseModel
@@ -143,4 +143,12 @@ class Review(BaseModel):
     @property
     def is_pending(self) -> bool:
         """Check if review is waiting for analysis"""
-        return self.status == ReviewStatus.PENDING
\ No newline at end of file
+        return self.status == ReviewStatus.PENDING
+
+# Matches the keyset order of the per-hotel review lists, so a page is an index range scan
+Index(
+    "ix_reviews_hotel_id_created_at_id",
+    Review.hotel_id,
+    Review.created_at.desc(),
+    Review.id.desc()
+)
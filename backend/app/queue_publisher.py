@@ -1,89 +1,258 @@
 import os
-import pika
-import json
+import atexit
+import queue
+import threading
+import time
+import orjson
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
-class ReviewQueuePublisher:
-    """Publishes reviews to RabbitMQ for processing"""
+# Events queued by request threads are published by one background thread
+PUBLISH_QUEUE_SIZE = int(os.getenv('PUBLISH_QUEUE_SIZE', '1000'))
+PUBLISH_BATCH_SIZE = int(os.getenv('PUBLISH_BATCH_SIZE', '100'))
+PUBLISH_BATCH_TIMEOUT = float(os.getenv('PUBLISH_BATCH_TIMEOUT', '0.1'))
 
-    def __init__(self):
+# The analyzer only reads the start of a review (512 tokens), so longer content is cut; 0 sends it whole
+MAX_ANALYSIS_CHARS = int(os.getenv('MAX_ANALYSIS_CHARS', '2048'))
+# Reviews with more content than this (UTF-8 bytes) are published by reference
+CLAIM_CHECK_THRESHOLD = int(os.getenv('CLAIM_CHECK_THRESHOLD', '65536'))
+
+def _review_created_event(review_id, review_data):
+    """
+    Build the ReviewCreated event body for a review
+    
+    Content longer than MAX_ANALYSIS_CHARS is cut to that length and
+    flagged with content_truncated; the full text stays in the reviews
+    table. A null title is left out. With the cap disabled, very large
+    content is left out of the message instead (claim check): the event
+    carries content_ref, the review's path under the reviews API, and
+    the worker fetches the text from there.
+    """
+    # Same key order for every event, small fields first and content last
+    event = {
+        'event_type': 'ReviewCreated',
+        'review_id': review_id,
+        'hotel_id': review_data.get('hotel_id'),
+        'rating': review_data.get('rating')
+    }
+    title = review_data.get('title')
+    if title is not None:
+        event['title'] = title
+
+    content = review_data.get('content')
+    if MAX_ANALYSIS_CHARS and content and len(content) > MAX_ANALYSIS_CHARS:
+        event['content'] = content[:MAX_ANALYSIS_CHARS]
+        event['content_truncated'] = True
+    elif _content_size_exceeds(content, CLAIM_CHECK_THRESHOLD):
+        event['content'] = None
+        event['content_ref'] = f"reviews/{review_id}"
+    else:
+        event['content'] = content
+    return event
+
+def _content_size_exceeds(content, limit):
+    """Whether content is more than limit bytes as UTF-8, encoding it only when the length can't tell"""
+    if not content or len(content) * 4 <= limit:
+        return False
+    return len(content) > limit or len(content.encode('utf-8')) > limit
+
+class MessageBatcher:
+    """
+    Queues ReviewCreated events and publishes them from a background thread
+    
+    Request threads only put the event on a bounded queue. The batcher's
+    thread runs a pika SelectConnection whose channel is in confirm mode
+    with an ack/nack callback: queued events are written every timeout
+    seconds (or as soon as batch_size are waiting) without waiting for
+    the broker, and are tracked by delivery tag until their confirm
+    arrives. Events still unconfirmed when the connection drops are
+    published again after reconnecting.
+    """
+
+    RECONNECT_DELAY = 5
+
+    def __init__(self, maxsize=PUBLISH_QUEUE_SIZE, batch_size=PUBLISH_BATCH_SIZE, timeout=PUBLISH_BATCH_TIMEOUT):
         self.host = os.getenv('RABBITMQ_HOST', 'rabbitmq')
-        self.queue_name = 'review.created'
-        self.connection = None
-        self.channel = None
+        self.queue_name = os.getenv('REVIEW_QUEUE_NAME', 'review.created')
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._connection = None
+        self._channel = None
+        self._properties = None
+        # delivery tag -> event, for events written but not yet confirmed
+        self._pending = {}
+        self._next_tag = 1
+        self._retry = []
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='review-publisher', daemon=True)
+        self._thread.start()
 
-    def connect(self):
-        """Connect to RabbitMQ"""
-        try:
-            self.connection = pika.BlockingConnection(
-                pika.ConnectionParameters(host=self.host)
-            )
-            self.channel = self.connection.channel()
-            
-            self.channel.queue_declare(
-                queue=self.queue_name,
-                durable=True 
-            )
-            
-            logger.info(f"✅ Connected to RabbitMQ: {self.host}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Error connecting to RabbitMQ: {e}")
-            return False
-        
-    def publish_review(self, review_id, review_data):
+    def enqueue(self, review_id, review_data, persistent=True):
         """
-        Publish ReviewCreated event
+        Queue a ReviewCreated event for publishing
         
         Args:
             review_id: Review ID
             review_data: Review data (content, rating, etc)
+            persistent: If False, the broker may keep the message in memory only
+        
+        Returns:
+            bool: False if the queue is full (the event is dropped)
         """
         try:
-            if not self.channel or self.channel.is_closed:
-                self.connect()
-
-            event = {
-                'event_type': 'ReviewCreated',
-                'review_id': review_id,
-                'title': review_data.get('title'),
-                'content': review_data.get('content'),
-                'rating': review_data.get('rating'),
-                'hotel_id': review_data.get('hotel_id')
-            }
-
-            self.channel.basic_publish(
-                exchange='',
-                routing_key=self.queue_name,
-                body=json.dumps(event),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                    content_type='application/json'
-                )
-            )
-            
-            logger.info(f"📤 Published ReviewCreated event for review {review_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Error publishing review {review_id}: {e}")
+            # Never blocks: a full queue means the broker is behind, and waiting would only tie up the request thread
+            self._queue.put_nowait((review_id, review_data, persistent))
+        except queue.Full:
+            logger.error("❌ Publish queue full, dropping ReviewCreated event for review %s", review_id)
             return False
-        
-    def close(self):
-        """Close connection"""
-        if self.connection and not self.connection.is_closed:
-            self.connection.close()
-
-# Global instance (singleton)
-_publisher = None
-
-def get_publisher():
-    """Returns publisher instance"""
-    global _publisher
-    if _publisher is None:
-        _publisher = ReviewQueuePublisher()
-        _publisher.connect()
-    return _publisher
\ No newline at end of file
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake()
+        return True
+
+    def flush(self, timeout=5):
+        """Publish everything queued, wait up to timeout seconds for the confirms, then disconnect"""
+        if not self._thread.is_alive():
+            return
+        self._stopping = True
+        self._wake()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"⚠️ Publisher stopped with {self._queue.qsize() + len(self._pending)} events unconfirmed")
+
+    def _wake(self):
+        """Have the ioloop publish the queue now instead of at its next tick"""
+        connection = self._connection
+        if connection is not None and connection.is_open:
+            connection.ioloop.add_callback_threadsafe(self._publish_queued)
+
+    def _run(self):
+        import pika
+
+        while not self._stopping:
+            self._connection = pika.SelectConnection(
+                pika.ConnectionParameters(
+                    host=self.host,
+                    heartbeat=60,
+                    blocked_connection_timeout=30
+                ),
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_error,
+                on_close_callback=self._on_connection_closed
+            )
+            self._connection.ioloop.start()
+
+            if not self._stopping:
+                time.sleep(self.RECONNECT_DELAY)
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection, error):
+        logger.error(f"❌ Error connecting to RabbitMQ: {error}")
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        self._channel = None
+        if self._pending:
+            logger.warning(f"⚠️ Connection closed with {len(self._pending)} unconfirmed events, republishing them")
+            self._retry.extend(self._pending.values())
+            self._pending.clear()
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.queue_declare(
+            queue=self.queue_name,
+            durable=True,
+            callback=lambda _frame: channel.confirm_delivery(
+                ack_nack_callback=self._on_confirm,
+                callback=lambda _frame: self._on_ready(channel)
+            )
+        )
+
+    def _on_channel_closed(self, channel, reason):
+        # A closed channel can't publish any more; reconnect from scratch
+        if self._connection.is_open:
+            self._connection.close()
+
+    def _on_ready(self, channel):
+        import pika
+
+        self._channel = channel
+        self._next_tag = 1
+        # persistent -> properties, built once per connection
+        self._properties = {
+            persistent: pika.BasicProperties(
+                delivery_mode=2 if persistent else 1,
+                content_type='application/json',
+                content_encoding='utf-8'
+            )
+            for persistent in (True, False)
+        }
+        logger.info(f"✅ Connected to RabbitMQ: {self.host}")
+        self._tick()
+
+    def _tick(self):
+        self._publish_queued()
+        if self._channel is not None:
+            self._connection.ioloop.call_later(self.timeout, self._tick)
+
+    def _publish_queued(self):
+        """ioloop: write every queued event to the channel without waiting for confirms"""
+        if self._channel is None:
+            return
+
+        events, self._retry = self._retry, []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for index, event in enumerate(events):
+            review_id, review_data, persistent = event
+            try:
+                self._channel.basic_publish(
+                    exchange='',
+                    routing_key=self.queue_name,
+                    body=orjson.dumps(_review_created_event(review_id, review_data)),
+                    properties=self._properties[persistent]
+                )
+            except Exception as e:
+                logger.error("❌ Error publishing review %s: %s", review_id, e)
+                self._retry.extend(events[index:])
+                return
+            self._pending[self._next_tag] = event
+            self._next_tag += 1
+
+        if events:
+            logger.info("📤 Published %d ReviewCreated events (%d awaiting confirm)", len(events), len(self._pending))
+        self._close_if_done()
+
+    def _on_confirm(self, frame):
+        """ioloop: the broker acked or nacked one or (multiple=True) all tags up to delivery_tag"""
+        from pika.spec import Basic
+
+        method = frame.method
+        acked = isinstance(method, Basic.Ack)
+        tags = [tag for tag in self._pending if tag <= method.delivery_tag] if method.multiple else [method.delivery_tag]
+        for tag in tags:
+            event = self._pending.pop(tag, None)
+            if event is not None and not acked:
+                logger.error("❌ Broker rejected ReviewCreated event for review %s", event[0])
+        self._close_if_done()
+
+    def _close_if_done(self):
+        if self._stopping and not self._pending and not self._retry and self._queue.empty():
+            self._connection.close()
+
+@lru_cache(maxsize=None)
+def get_batcher():
+    """Returns the message batcher (one per process), flushed at interpreter exit"""
+    batcher = MessageBatcher()
+    atexit.register(batcher.flush)
+    return batcher
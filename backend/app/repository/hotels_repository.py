@@ -1,7 +1,16 @@
 from extensions import db
-from typing import Optional, Tuple, List
+from typing import Iterable, Optional, Set, Tuple, List
 from models.hotel import Hotel
-from sqlalchemy import select, func
+from sqlalchemy import exists, select, func, tuple_
+from sqlalchemy.orm import selectinload, undefer
+import time
+
+_EXISTS_TTL = 60
+# Misses expire sooner so a newly created hotel's id is usable right away
+_NOT_EXISTS_TTL = 5
+_EXISTS_MAX_ENTRIES = 10_000
+# hotel_id -> (expiry (monotonic), result) of exists(); shared by all repositories
+_exists_cache: dict = {}
 
 class HotelRepository:
     """
@@ -26,7 +35,8 @@ class HotelRepository:
         page_size: int = 20,
         city: Optional[str] = None,
         country: Optional[str] = None,
-        min_rating: Optional[float] = None
+        min_rating: Optional[float] = None,
+        include_reviews: bool = False
     ) -> Tuple[List[Hotel], int]:
         """
         Get paginated list of hotels with optional filters.
@@ -37,44 +47,90 @@ class HotelRepository:
             city: Filter by city (case-insensitive, partial match)
             country: Filter by country (case-insensitive, partial match)
             min_rating: Minimum star rating filter
+            include_reviews: If True, load each hotel's reviews in one extra query
             
         Returns:
             Tuple of (list of hotels, total count)
         """
-        query = select(Hotel)
+        # COUNT(*) OVER () returns the filtered total with the page rows, in the same query
+        query = self._apply_filters(
+            select(Hotel, func.count().over().label('total')), city, country, min_rating
+        )
+        query = query.options(undefer(Hotel.review_count))
+        if include_reviews:
+            query = query.options(selectinload(Hotel.reviews))
+        query = query.order_by(Hotel.name, Hotel.id).offset((page - 1) * page_size).limit(page_size)
         
-        # Apply filters
-        if city:
-            query = query.where(Hotel.city.ilike(f'%{city}%'))
-        if country:
-            query = query.where(Hotel.country.ilike(f'%{country}%'))
-        if min_rating is not None:
-            query = query.where(Hotel.star_rating >= min_rating)
+        rows = self.session.execute(query).all()
+        if rows:
+            return [row.Hotel for row in rows], rows[0].total
         
-        # Get total count
-        total = self.session.scalar(
-            select(func.count()).select_from(query.subquery())
+        # Empty page: no row carries the total, so it only needs counting past page 1
+        total = 0 if page == 1 else self.session.scalar(
+            self._apply_filters(select(func.count(Hotel.id)), city, country, min_rating)
         )
         
-        # Apply pagination and ordering
-        query = query.order_by(Hotel.name).offset((page - 1) * page_size).limit(page_size)
+        return [], total
+    
+    def get_after(
+        self,
+        after: Optional[Tuple[str, int]] = None,
+        page_size: int = 20,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        min_rating: Optional[float] = None
+    ) -> Tuple[List[Hotel], bool]:
+        """
+        Get the hotels following a (name, id) position, in get_all order.
+        
+        Args:
+            after: (name, id) of the last hotel of the previous page (None for the first page)
+            page_size: Number of items per page
+            city: Filter by city (case-insensitive, partial match)
+            country: Filter by country (case-insensitive, partial match)
+            min_rating: Minimum star rating filter
+            
+        Returns:
+            Tuple of (list of hotels, whether more hotels follow)
+        """
+        query = self._apply_filters(select(Hotel), city, country, min_rating)
+        if after is not None:
+            # Seek past the previous page instead of OFFSET, so every page costs the same
+            query = query.where(tuple_(Hotel.name, Hotel.id) > tuple(after))
+        query = query.options(undefer(Hotel.review_count))
+        # One extra row tells whether there is a next page without a COUNT
+        query = query.order_by(Hotel.name, Hotel.id).limit(page_size + 1)
         
-        # Execute query
         hotels = list(self.session.scalars(query).all())
         
-        return hotels, total
+        return hotels[:page_size], len(hotels) > page_size
+    
+    @staticmethod
+    def _apply_filters(stmt, city=None, country=None, min_rating=None):
+        """Apply the get_all filters to a select statement"""
+        if city:
+            stmt = stmt.where(Hotel.city.ilike(f'%{city}%'))
+        if country:
+            stmt = stmt.where(Hotel.country.ilike(f'%{country}%'))
+        if min_rating is not None:
+            stmt = stmt.where(Hotel.star_rating >= min_rating)
+        return stmt
     
-    def get_by_id(self, hotel_id: int) -> Optional[Hotel]:
+    def get_by_id(self, hotel_id: int, include_reviews: bool = False) -> Optional[Hotel]:
         """
         Get hotel by ID.
         
         Args:
             hotel_id: Hotel ID
+            include_reviews: If True, eagerly load the hotel's reviews
             
         Returns:
             Hotel instance or None if not found
         """
-        return self.session.get(Hotel, hotel_id)
+        options = [undefer(Hotel.review_count)]
+        if include_reviews:
+            options.append(selectinload(Hotel.reviews))
+        return self.session.get(Hotel, hotel_id, options=options)
     
     def create(self, hotel_data: dict) -> Hotel:
         """
@@ -88,8 +144,9 @@ class HotelRepository:
         """
         hotel = Hotel(**hotel_data)
         self.session.add(hotel)
+        # The INSERT already returns the new id; no SELECT needed afterwards
         self.session.commit()
-        self.session.refresh(hotel)
+        _exists_cache.pop(hotel.id, None)
         return hotel
     
     def update(self, hotel_id: int, update_data: dict) -> Optional[Hotel]:
@@ -131,6 +188,7 @@ class HotelRepository:
         
         self.session.delete(hotel)
         self.session.commit()
+        _exists_cache.pop(hotel_id, None)
         return True
     
     def exists(self, hotel_id: int) -> bool:
@@ -143,6 +201,52 @@ class HotelRepository:
         Returns:
             True if exists, False otherwise
         """
+        # EXISTS stops at the first matching row instead of counting
         return self.session.scalar(
-            select(func.count()).where(Hotel.id == hotel_id)
-        ) > 0
\ No newline at end of file
+            select(exists().where(Hotel.id == hotel_id))
+        )
+    
+    def exists_many(self, hotel_ids: Iterable[int]) -> Set[int]:
+        """
+        Check which of several hotels exist, with one query.
+        
+        Args:
+            hotel_ids: Hotel IDs
+            
+        Returns:
+            The subset of hotel_ids that exist
+        """
+        hotel_ids = set(hotel_ids)
+        if not hotel_ids:
+            return set()
+        return set(self.session.scalars(
+            select(Hotel.id).where(Hotel.id.in_(hotel_ids))
+        ).all())
+    
+    def exists_cached(self, hotel_id: int) -> bool:
+        """
+        Check if hotel exists, remembering the answer for a short while.
+        
+        Positive answers are kept for _EXISTS_TTL seconds and negative ones
+        for _NOT_EXISTS_TTL, so neither normal traffic nor a client
+        retrying an unknown id queries the table every time. Hotels are
+        rarely deleted, and a stale positive entry is harmless: the
+        reviews.hotel_id foreign key still rejects the insert.
+        
+        Args:
+            hotel_id: Hotel ID
+            
+        Returns:
+            True if exists, False otherwise
+        """
+        now = time.monotonic()
+        entry = _exists_cache.get(hotel_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        
+        found = self.exists(hotel_id)
+        
+        if len(_exists_cache) >= _EXISTS_MAX_ENTRIES:
+            _exists_cache.clear()
+        _exists_cache[hotel_id] = (now + (_EXISTS_TTL if found else _NOT_EXISTS_TTL), found)
+        return found
@@ -1,8 +1,10 @@
 from extensions import db
+from models.hotel import Hotel
 from models.review import Review
+from datetime import datetime
 from typing import Optional, Tuple, List
 from models.review import ReviewStatus
-from sqlalchemy import select, func
+from sqlalchemy import and_, insert, select, func, tuple_
 from sqlalchemy.orm import joinedload
 
 
@@ -34,9 +36,29 @@ class ReviewRepository:
         """
         review = Review(**review_data)
         self.session.add(review)
+        # The INSERT already returns the new id; no SELECT needed afterwards
         self.session.commit()
-        self.session.refresh(review)
         return review
+
+    def bulk_create(self, rows: List[dict]) -> List[Review]:
+        """
+        Create several reviews with a single executemany INSERT ... RETURNING.
+        
+        The inserted rows, including server-generated timestamps, come
+        back as Review instances.
+        
+        Args:
+            rows: List of dictionaries with review attributes
+            
+        Returns:
+            Created Review instances, in the order of rows
+        """
+        reviews = list(self.session.scalars(
+            insert(Review).returning(Review, sort_by_parameter_order=True),
+            rows
+        ).all())
+        self.session.commit()
+        return reviews
     
     def get_all(
         self,
@@ -55,21 +77,113 @@ class ReviewRepository:
         Returns:
             Tuple of (list of reviews, total count)
         """
-        query = select(Review)
+        # COUNT(*) OVER () returns the filtered total with the page rows, in the same query
+        query = self._apply_filters(select(Review, func.count().over().label('total')), status=status)
+        query = query.order_by(Review.created_at.desc(), Review.id.desc())
+        query = query.offset((page - 1) * page_size).limit(page_size)
         
-        if status:
-            query = query.where(Review.status == status)
+        return self._page_with_total(query, page, status=status)
+    
+    def get_page(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        status: Optional[ReviewStatus] = None,
+        hotel_id: Optional[int] = None
+    ) -> Tuple[List[Review], bool]:
+        """
+        Get a page of reviews, newest first, without counting them.
+        
+        Args:
+            page: Page number (1-indexed)
+            page_size: Number of items per page
+            status: Filter by review status (optional)
+            hotel_id: Only reviews of this hotel (optional)
+            
+        Returns:
+            Tuple of (list of reviews, whether more reviews follow)
+        """
+        query = self._apply_filters(select(Review), hotel_id=hotel_id, status=status)
+        # One extra row tells whether there is a next page without a COUNT
+        query = query.order_by(Review.created_at.desc(), Review.id.desc())
+        query = query.offset((page - 1) * page_size).limit(page_size + 1)
         
-        query = query.order_by(Review.created_at.desc())
+        reviews = list(self.session.scalars(query).all())
         
-        total = self.session.scalar(
-            select(func.count()).select_from(query.subquery())
-        )
+        return reviews[:page_size], len(reviews) > page_size
+    
+    def get_after(
+        self,
+        after: Optional[Tuple[datetime, int]] = None,
+        page_size: int = 20,
+        status: Optional[ReviewStatus] = None,
+        hotel_id: Optional[int] = None
+    ) -> Tuple[List[Review], bool]:
+        """
+        Get the reviews following a (created_at, id) position, newest first.
+        
+        Args:
+            after: (created_at, id) of the last review of the previous page (None for the first page)
+            page_size: Number of items per page
+            status: Filter by review status (optional)
+            hotel_id: Only reviews of this hotel (optional)
+            
+        Returns:
+            Tuple of (list of reviews, whether more reviews follow)
+        """
+        query = self._apply_filters(select(Review), hotel_id=hotel_id, status=status)
+        if after is not None:
+            # Seek past the previous page instead of OFFSET, so every page costs the same
+            query = query.where(tuple_(Review.created_at, Review.id) < tuple(after))
+        # One extra row tells whether there is a next page without a COUNT
+        query = query.order_by(Review.created_at.desc(), Review.id.desc()).limit(page_size + 1)
         
-        query = query.offset((page - 1) * page_size).limit(page_size)
         reviews = list(self.session.scalars(query).all())
         
-        return reviews, total
+        return reviews[:page_size], len(reviews) > page_size
+    
+    def get_by_hotel_checked(
+        self,
+        hotel_id: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        page_size: int = 20,
+        status: Optional[ReviewStatus] = None
+    ) -> Tuple[List[Review], bool, bool]:
+        """
+        Get the reviews of a hotel following a (created_at, id) position, and whether the hotel exists.
+        
+        Selects from hotels LEFT JOIN reviews, so one query answers both:
+        no row means there is no such hotel, and a hotel without matching
+        reviews comes back as a single row with no review.
+        
+        Args:
+            hotel_id: Hotel ID
+            after: (created_at, id) of the last review of the previous page (None for the first page)
+            page_size: Number of items per page
+            status: Filter by review status (optional)
+            
+        Returns:
+            Tuple of (list of reviews, whether more reviews follow, whether the hotel exists)
+        """
+        conditions = [Review.hotel_id == Hotel.id]
+        if status:
+            conditions.append(Review.status == status)
+        if after is not None:
+            conditions.append(tuple_(Review.created_at, Review.id) < tuple(after))
+        
+        query = (
+            select(Review)
+            .select_from(Hotel)
+            .outerjoin(Review, and_(*conditions))
+            .where(Hotel.id == hotel_id)
+            .order_by(Review.created_at.desc(), Review.id.desc())
+            .limit(page_size + 1)
+        )
+        
+        rows = self.session.scalars(query).all()
+        reviews = [review for review in rows if review is not None]
+        
+        return reviews[:page_size], len(reviews) > page_size, bool(rows)
     
     def get_by_hotel(
         self,
@@ -90,22 +204,33 @@ class ReviewRepository:
         Returns:
             Tuple of (list of reviews, total count)
         """
-        query = select(Review).where(Review.hotel_id == hotel_id)
-    
-        if status:
-            query = query.where(Review.status == status)
-  
-        query = query.order_by(Review.created_at.desc())
-
-        total = self.session.scalar(
-            select(func.count()).select_from(query.subquery())
+        query = self._apply_filters(
+            select(Review, func.count().over().label('total')), hotel_id=hotel_id, status=status
         )
- 
+        query = query.order_by(Review.created_at.desc(), Review.id.desc())
         query = query.offset((page - 1) * page_size).limit(page_size)
-
-        reviews = list(self.session.scalars(query).all())
         
-        return reviews, total
+        return self._page_with_total(query, page, hotel_id=hotel_id, status=status)
+    
+    def _page_with_total(self, query, page, hotel_id=None, status=None) -> Tuple[List[Review], int]:
+        """Run a (Review, total) page query; count separately only for an empty page past the first"""
+        rows = self.session.execute(query).all()
+        if rows:
+            return [row.Review for row in rows], rows[0].total
+        
+        total = 0 if page == 1 else self.session.scalar(
+            self._apply_filters(select(func.count(Review.id)), hotel_id=hotel_id, status=status)
+        )
+        return [], total
+    
+    @staticmethod
+    def _apply_filters(stmt, hotel_id=None, status=None):
+        """Apply the hotel/status filters shared by the list queries"""
+        if hotel_id is not None:
+            stmt = stmt.where(Review.hotel_id == hotel_id)
+        if status:
+            stmt = stmt.where(Review.status == status)
+        return stmt
     
     def get_by_id(self, review_id: int, with_hotel: bool = False) -> Optional[Review]:
         """
@@ -1,87 +1,265 @@
 import os
 import logging
-import pika
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from flask import current_app
 from models.review import Review, ReviewStatus
 from extensions import db
+from sqlalchemy import Float, Integer, JSON, String, cast, column, update, values
 
 logger = logging.getLogger(__name__)
 
+# Results are buffered and written in one statement per batch
+BATCH_SIZE = int(os.getenv('RESULT_BATCH_SIZE', '50'))
+BATCH_TIMEOUT = float(os.getenv('RESULT_BATCH_TIMEOUT', '0.2'))
+# Several batches in flight, so deliveries keep coming while one is being committed
+PREFETCH_COUNT = int(os.getenv('RESULT_PREFETCH_COUNT', str(BATCH_SIZE * 5)))
+
 def start_consumer():
-    """Start consuming analysis results"""
-    rabbitmq_host = os.getenv('RABBITMQ_HOST', 'rabbitmq')
-    queue_name = 'analysis.completed'
-    
+    """Start consuming analysis results (call inside an app context)"""
+    consumer = ResultConsumer(
+        current_app._get_current_object(),
+        os.getenv('RABBITMQ_HOST', 'rabbitmq'),
+        'analysis.completed'
+    )
+
     logger.info("=" * 60)
     logger.info("📥 Result Consumer - InnSight API")
     logger.info("=" * 60)
-    logger.info(f"🔌 Connecting to RabbitMQ: {rabbitmq_host}")
+    logger.info(f"🔌 Connecting to RabbitMQ: {consumer.host}")
 
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(
-            host=rabbitmq_host,
-            heartbeat=600,
-            blocked_connection_timeout=300
-        )
-    )
-    channel = connection.channel()
+    try:
+        consumer.run()
+    except KeyboardInterrupt:
+        logger.info("\n🛑 Stopping consumer...")
+        consumer.stop()
 
-    channel.queue_declare(queue=queue_name, durable=True)
+    logger.info("👋 Consumer stopped")
 
-    channel.basic_qos(prefetch_count=1)
 
-    channel.basic_consume(
-        queue=queue_name,
-        on_message_callback=callback,
-        auto_ack=False
-    )
-    
-    logger.info(f"✅ Connected successfully!")
-    logger.info(f"👂 Listening on queue: '{queue_name}'")
-    logger.info("   Press CTRL+C to exit")
-    logger.info("=" * 60)
+class ResultConsumer:
+    """
+    Consumes analysis.completed on a pika SelectConnection
     
-    try:
-        channel.start_consuming()
-    except KeyboardInterrupt:
-        logger.info("\n🛑 Stopping consumer...")
-        channel.stop_consuming()
+    The connection's ioloop only does AMQP I/O; database writes run on
+    the ResultBatcher's writer thread, so the next deliveries keep
+    arriving while a batch is being committed.
+    """
+
+    def __init__(self, app, host, queue_name):
+        self.app = app
+        self.host = host
+        self.queue_name = queue_name
+        self.connection = None
+        self.channel = None
+        self.batcher = None
+
+    def run(self):
+        """Connect and run the ioloop until the connection closes"""
+        import pika
+
+        self.connection = pika.SelectConnection(
+            pika.ConnectionParameters(
+                host=self.host,
+                heartbeat=600,
+                blocked_connection_timeout=300
+            ),
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_error,
+            on_close_callback=self._on_connection_closed
+        )
+        self.connection.ioloop.start()
+
+    def stop(self):
+        """Write out buffered results, settle them, then close the connection"""
+        if self.batcher is not None:
+            self.batcher.stop()
+        if self.connection is not None and self.connection.is_open:
+            # Queued after the batcher's acks, so those go out first
+            self.connection.ioloop.add_callback_threadsafe(self.connection.close)
+            self.connection.ioloop.start()
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_error(self, connection, error):
+        logger.error(f"❌ Error connecting to RabbitMQ: {error}")
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self.channel = channel
+        channel.queue_declare(
+            queue=self.queue_name,
+            durable=True,
+            callback=lambda _frame: channel.basic_qos(
+                prefetch_count=PREFETCH_COUNT,
+                callback=self._on_qos_ok
+            )
+        )
+
+    def _on_qos_ok(self, _frame):
+        self.batcher = ResultBatcher(self.app, self.connection, self.channel)
+
+        self.channel.basic_consume(
+            queue=self.queue_name,
+            on_message_callback=self.batcher.on_message,
+            auto_ack=False
+        )
+
+        logger.info(f"✅ Connected successfully!")
+        logger.info(f"👂 Listening on queue: '{self.queue_name}'")
+        logger.info(f"   Batch size: {BATCH_SIZE}, timeout: {BATCH_TIMEOUT}s, prefetch: {PREFETCH_COUNT}")
+        logger.info("   Press CTRL+C to exit")
+        logger.info("=" * 60)
+
+
+class ResultBatcher:
+    """
+    Buffers AnalysisCompleted events and writes them in batches
     
-    connection.close()
-    logger.info("👋 Consumer stopped")
+    A batch is flushed when it reaches batch_size events or timeout
+    seconds after its first event. Each flush is one UPDATE ... FROM
+    (VALUES ...) and one commit on the writer thread, followed by one
+    multiple=True ack scheduled back onto the ioloop. Reviews deleted in
+    the meantime are simply not matched. If the batch statement fails,
+    its events are written one by one so a single bad event doesn't
+    hold up the rest.
+    """
 
-def callback(ch, method, properties, body):
-    """Callback when analysis result is received"""
-    try:
-        event = json.loads(body)
-        logger.info(f"📨 Received event: {event.get('event_type')}")
-        
-        if event.get('event_type') == 'AnalysisCompleted':
-            review_id = event.get('review_id')
-            results = event.get('data')
-            
-            logger.info(f"🔄 Processing AnalysisCompleted for review {review_id}")
-
-            success = update_review_with_results(review_id, results)
-            
-            if success:
-                ch.basic_ack(delivery_tag=method.delivery_tag)
-                logger.info("✅ Event processed and acknowledged")
-            else:
-                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-                logger.warning("⚠️ Processing failed, event requeued")
-        else:
+    def __init__(self, app, connection, channel, batch_size=BATCH_SIZE, timeout=BATCH_TIMEOUT):
+        self.app = app
+        self.connection = connection
+        self.channel = channel
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.pending = []
+        self._timer = None
+        # A single writer keeps commits (and therefore acks) in delivery order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='result-writer')
+
+    def stop(self):
+        """Flush the buffer and wait for the writer thread to finish"""
+        self.flush()
+        self._writer.shutdown(wait=True)
+
+    def on_message(self, ch, method, properties, body):
+        """Callback when analysis result is received"""
+        try:
+            event = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"❌ Invalid JSON: {e}")
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        if event.get('event_type') != 'AnalysisCompleted':
             logger.warning(f"⚠️ Unknown event type: {event.get('event_type')}")
             ch.basic_ack(delivery_tag=method.delivery_tag)
-            
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Invalid JSON: {e}")
-        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-        
-    except Exception as e:
-        logger.error(f"❌ Error processing event: {e}")
-        logger.exception("Full traceback:")
-        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            return
+
+        self.pending.append((method.delivery_tag, event.get('review_id'), event.get('data')))
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self.connection.ioloop.call_later(self.timeout, self._on_timeout)
+
+    def _on_timeout(self):
+        self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Hand the buffered results to the writer thread"""
+        if self._timer is not None:
+            self.connection.ioloop.remove_timeout(self._timer)
+            self._timer = None
+
+        batch, self.pending = self.pending, []
+        if batch:
+            self._writer.submit(self._write, batch)
+
+    def _write(self, batch):
+        """Writer thread: store a batch and schedule its acks on the ioloop"""
+        with self.app.app_context():
+            try:
+                db.session.execute(_batch_update(batch))
+                db.session.commit()
+                outcomes = None
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"⚠️ Batch update of {len(batch)} reviews failed ({e}), retrying one by one")
+                outcomes = [self._write_one(review_id, results) for _, review_id, results in batch]
+
+        self.connection.ioloop.add_callback_threadsafe(partial(self._settle, batch, outcomes))
+
+    def _write_one(self, review_id, results):
+        """Fallback: update a single review of a failed batch"""
+        try:
+            return update_review_with_results(review_id, results)
+        except Exception as e:
+            logger.error(f"❌ Error processing event: {e}")
+            logger.exception("Full traceback:")
+            return False
+
+    def _settle(self, batch, outcomes):
+        """ioloop: ack or requeue the deliveries of a written batch"""
+        if outcomes is None:
+            self.channel.basic_ack(delivery_tag=batch[-1][0], multiple=True)
+            logger.info(f"✅ Updated and acknowledged {len(batch)} reviews")
+            return
+
+        for (delivery_tag, review_id, _), success in zip(batch, outcomes):
+            if success:
+                self.channel.basic_ack(delivery_tag=delivery_tag)
+            else:
+                self.channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+                logger.warning(f"⚠️ Processing failed for review {review_id}, event requeued")
+
+def _batch_update(batch):
+    """
+    One UPDATE reviews ... FROM (VALUES ...) statement for a whole batch
+    
+    A plain executemany UPDATE is still one statement per row on the
+    wire; joining against a VALUES list writes every row in a single
+    round trip. The VALUES columns are untyped parameters (NULL for
+    fields the worker doesn't fill in yet), hence the casts.
+    """
+    rows = values(
+        column('id', Integer),
+        column('sentiment_score', Float),
+        column('sentiment_label', String),
+        column('aspects', JSON),
+        column('topics', JSON),
+        column('key_phrases', JSON),
+        name='results'
+    ).data([
+        (
+            review_id,
+            results.get('sentiment_score'),
+            results.get('sentiment_label'),
+            results.get('aspects'),
+            results.get('topics'),
+            results.get('key_phrases')
+        )
+        for _, review_id, results in batch
+    ])
+
+    return (
+        update(Review)
+        .where(Review.id == rows.c.id)
+        .values(
+            sentiment_score=cast(rows.c.sentiment_score, Float),
+            sentiment_label=cast(rows.c.sentiment_label, String),
+            aspects=cast(rows.c.aspects, JSON),
+            topics=cast(rows.c.topics, JSON),
+            key_phrases=cast(rows.c.key_phrases, JSON),
+            status=ReviewStatus.COMPLETED
+        )
+        .execution_options(synchronize_session=False)
+    )
 
 def update_review_with_results(review_id, results):
     """
@@ -94,24 +272,28 @@ def update_review_with_results(review_id, results):
     try:        
         logger.info(f"💾 Updating review {review_id} in database...")
 
-        review = Review.query.get(review_id)
+        # One UPDATE, no need to load the row first
+        result = db.session.execute(
+            update(Review)
+            .where(Review.id == review_id)
+            .values(
+                sentiment_score=results.get('sentiment_score'),
+                sentiment_label=results.get('sentiment_label'),
+                aspects=results.get('aspects'),
+                topics=results.get('topics'),
+                key_phrases=results.get('key_phrases'),
+                status=ReviewStatus.COMPLETED
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
         
-        if not review:
+        if result.rowcount == 0:
             logger.error(f"❌ Review {review_id} not found!")
             return False
         
-        # Update with AI results
-        review.sentiment_score = results.get('sentiment_score')
-        review.sentiment_label = results.get('sentiment_label')
-        review.aspects = results.get('aspects')
-        review.topics = results.get('topics')
-        review.key_phrases = results.get('key_phrases')
-        review.status = ReviewStatus.COMPLETED
-        
-        db.session.commit()
-        
         logger.info(f"✅ Review {review_id} updated successfully!")
-        logger.info(f"   Sentiment: {review.sentiment_label} ({review.sentiment_score})")
+        logger.info(f"   Sentiment: {results.get('sentiment_label')} ({results.get('sentiment_score')})")
         logger.info(f"   Status: → COMPLETED")
         
         return True
@@ -121,9 +303,15 @@ def update_review_with_results(review_id, results):
         logger.exception("Full traceback:")
         
         try:
-            review.status = ReviewStatus.FAILED
+            db.session.rollback()
+            db.session.execute(
+                update(Review)
+                .where(Review.id == review_id)
+                .values(status=ReviewStatus.FAILED)
+                .execution_options(synchronize_session=False)
+            )
             db.session.commit()
         except:
-            pass
+            db.session.rollback()
         
-        return False
\ No newline at end of file
+        return False
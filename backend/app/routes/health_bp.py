@@ -1,38 +1,67 @@
-from flask import Blueprint, jsonify
+import time
+import orjson
+from flask import Blueprint, Response, jsonify
 from extensions import db
 
 health_bp = Blueprint('health', __name__)
 
+# Liveness answer never changes, so it is encoded once (keys sorted like jsonify)
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'Innsight AI API'
+}, option=orjson.OPT_SORT_KEYS)
+
+# While the database is down, probes within this many seconds of the last
+# failed check get the cached 503 body instead of trying again
+_DB_RECHECK_INTERVAL = 1.0
+_db_failure = {'at': None, 'error': None, 'body': None}
+
 @health_bp.route('/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint.
     
     Returns:
-        JSON response with service status
+        JSON response with service status (cacheable for 5 seconds)
     """
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Innsight AI API'
-    }), 200
+    return Response(
+        _HEALTH_BODY,
+        status=200,
+        mimetype='application/json',
+        headers={'Cache-Control': 'public, max-age=5'}
+    )
 
 @health_bp.route('/health/db', methods=['GET'])
 def database_health():
     """
     Database health check endpoint.
     
+    After a failed check, further calls within _DB_RECHECK_INTERVAL
+    seconds return the same 503 without touching the database.
+    
     Returns:
         JSON response with database connection status
     """
+    failed_at = _db_failure['at']
+    if failed_at is not None and time.monotonic() - failed_at < _DB_RECHECK_INTERVAL:
+        return Response(_db_failure['body'], status=503, mimetype='application/json')
+    
     try:
         db.session.execute(db.text('SELECT 1'))
+        _db_failure['at'] = None
         return jsonify({
             'status': 'healthy',
             'database': 'connected'
         }), 200
     except Exception as e:
-        return jsonify({
-            'status': 'unhealthy',
-            'database': 'disconnected',
-            'error': str(e)
-        }), 503
\ No newline at end of file
+        error = str(e)
+        # Same error as last time (the usual case during an outage): reuse its body
+        if error != _db_failure['error']:
+            _db_failure['error'] = error
+            _db_failure['body'] = orjson.dumps({
+                'status': 'unhealthy',
+                'database': 'disconnected',
+                'error': error
+            }, option=orjson.OPT_SORT_KEYS)
+        _db_failure['at'] = time.monotonic()
+        return Response(_db_failure['body'], status=503, mimetype='application/json')
@@ -1,18 +1,61 @@
-from flask import Blueprint, request, current_app, jsonify
+import orjson
+from flask import Blueprint, Response, request, stream_with_context, current_app, jsonify
 from services.hotels_service import HotelService
-from schemas.hotel_schema import HotelListResponse, HotelResponse, HotelCreate, HotelUpdate
-from pydantic import ValidationError
+from schemas.hotel_schema import HotelResponse, HotelCreate, HotelUpdate, HotelQueryParams
+from pydantic import TypeAdapter, ValidationError
 
 
 hotels_bp = Blueprint('hotels', __name__)
 
+# Stateless (repositories go through the scoped db.session), so shared across requests
+_hotel_service = HotelService()
+
+# Serializes one list item at a time for the streamed list bodies
+HOTEL_ADAPTER = TypeAdapter(HotelResponse)
+HOTEL_QUERY_ADAPTER = TypeAdapter(HotelQueryParams)
+
+def _list_response(hotels, page_size, next_cursor, total=None, page=None, total_pages=None):
+    """Stream a page of hotels as a HotelListResponse-shaped JSON body"""
+    if page is None:
+        meta = {'page_size': page_size, 'next_cursor': next_cursor}
+    else:
+        meta = {
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'next_cursor': next_cursor
+        }
+
+    # The first item is serialized before the status is sent, so that failure is still a 500
+    items = iter(hotels)
+    first = next(items, None)
+    head = b'{"items":['
+    if first is not None:
+        head += HOTEL_ADAPTER.dump_json(HotelResponse.from_orm_fast(first))
+
+    def generate():
+        # Each item is written as soon as it is serialized; the page is never joined into one buffer
+        yield head
+        try:
+            for hotel in items:
+                yield b',' + HOTEL_ADAPTER.dump_json(HotelResponse.from_orm_fast(hotel))
+        except Exception:
+            # The 200 is already sent: log and let the server abort the truncated body
+            current_app.logger.exception("❌ Failed to stream hotel list")
+            raise
+        yield b'],' + orjson.dumps(meta)[1:]
+
+    return Response(stream_with_context(generate()), status=200, mimetype='application/json')
+
 @hotels_bp.route('', methods=['GET'])
 def get_hotels():
     """
     List all hotels with pagination and filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page; pass it empty for the first page
+        page (int): Page number (default: 1, deprecated in favour of cursor)
         page_size (int): Items per page (default: 20, max: 100)
         city (str): Filter by city
         country (str): Filter by country
@@ -24,29 +67,38 @@ def get_hotels():
         500: Internal server error
     """
     try:
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('page_size', current_app.config['DEFAULT_PAGE_SIZE']))
-        city = request.args.get('city')
-        country = request.args.get('country')
-        min_rating = request.args.get('min_rating')
-        
-        # Validate pagination
-        if page < 1:
-            return jsonify({'error': 'Page must be >= 1'}), 400
-        
-        page_size = min(page_size, current_app.config['MAX_PAGE_SIZE'])
-        
-        # Parse min_rating if provided
-        if min_rating:
-            try:
-                min_rating = float(min_rating)
-                if not (1 <= min_rating <= 5):
-                    return jsonify({'error': 'min_rating must be between 1 and 5'}), 400
-            except ValueError:
-                return jsonify({'error': 'min_rating must be a number'}), 400
+        params = HOTEL_QUERY_ADAPTER.validate_python(request.args.to_dict())
+        cursor = params.cursor
+        page = params.page
+        page_size = min(
+            params.page_size or current_app.config['DEFAULT_PAGE_SIZE'],
+            current_app.config['MAX_PAGE_SIZE']
+        )
+        city = params.city
+        country = params.country
+        min_rating = params.min_rating
+        
+        service = _hotel_service
+        
+        # Keyset pagination: seek from the cursor, no OFFSET and no COUNT
+        if cursor is not None:
+            hotels, next_cursor = service.list_hotels_after(
+                cursor=cursor,
+                page_size=page_size,
+                city=city,
+                country=country,
+                min_rating=min_rating
+            )
+            return _list_response(
+                hotels,
+                page_size,
+                next_cursor
+            )
+        
+        if 'page' in request.args:
+            current_app.logger.warning("⚠️ GET /hotels?page= is deprecated, use cursor= instead")
         
         # Get hotels
-        service = HotelService()
         hotels, total, total_pages = service.list_hotels(
             page=page,
             page_size=page_size,
@@ -55,17 +107,26 @@ def get_hotels():
             min_rating=min_rating
         )
         
+        # Lets page clients switch over to cursors from here on
+        next_cursor = service.cursor_after(hotels[-1]) if hotels and page < total_pages else None
+        
         # Serialize response
-        response = HotelListResponse(
-            items=[HotelResponse.model_validate(hotel) for hotel in hotels],
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        return _list_response(
+            hotels,
+            page_size,
+            next_cursor,
+            total,
+            page,
+            total_pages
         )
         
-        return jsonify(response.model_dump()), 200
-        
+    except ValidationError as error:
+        return jsonify({
+            'error': 'Validation error',
+            'details': error.errors()
+        }), 400
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
     except Exception as error:
         current_app.logger.error(f"Error listing hotels: {error}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -80,18 +141,30 @@ def get_hotel(hotel_id: int):
     
     Returns:
         200: JSON response with hotel details
+        304: Hotel unchanged since the ETag sent in If-None-Match
         404: Hotel not found
         500: Internal server error
     """
     try:
-        service = HotelService()
+        service = _hotel_service
         hotel = service.get_hotel(hotel_id)
         
         if not hotel:
             return jsonify({'error': 'Hotel not found'}), 404
         
-        response = HotelResponse.model_validate(hotel)
-        return jsonify(response.model_dump()), 200
+        # review_count changes without touching the hotel row, so it is part of the tag
+        etag = f'{hotel.id}-{int(hotel.updated_at.timestamp() * 1_000_000)}-{hotel.review_count}'
+        if request.if_none_match.contains_weak(etag):
+            # Client copy is current: no serialization, no body
+            response = Response(status=304)
+        else:
+            response = HotelResponse.model_validate(hotel)
+            response = Response(response.model_dump_json(), status=200, mimetype='application/json')
+        
+        response.set_etag(etag, weak=True)
+        # Clients may reuse a copy for 30s, then revalidate it with the ETag
+        response.headers['Cache-Control'] = 'private, max-age=30, stale-while-revalidate=60'
+        return response
         
     except Exception as error:
         current_app.logger.error(f"Error getting hotel {hotel_id}: {error}")
@@ -111,13 +184,13 @@ def create_hotel():
         500: Internal server error
     """
     try:
-        hotel_data = HotelCreate(**request.json)
+        hotel_data = HotelCreate(**request.get_json(cache=True))
         
-        service = HotelService()
+        service = _hotel_service
         hotel = service.create_hotel(hotel_data.model_dump())
         
         response = HotelResponse.model_validate(hotel)
-        return jsonify(response.model_dump()), 201
+        return Response(response.model_dump_json(), status=201, mimetype='application/json')
         
     except ValidationError as error:
         return jsonify({
@@ -148,16 +221,17 @@ def update_hotel(hotel_id: int):
         500: Internal server error
     """
     try:
-        update_data = HotelUpdate(**request.json)
+        # Only the fields the client actually sent
+        update_data = HotelUpdate(**request.get_json(cache=True)).model_dump(exclude_unset=True)
         
-        service = HotelService()
-        hotel = service.update_hotel(hotel_id, update_data.model_dump(exclude_none=True))
+        service = _hotel_service
+        hotel = service.update_hotel(hotel_id, update_data)
         
         if not hotel:
             return jsonify({'error': 'Hotel not found'}), 404
         
         response = HotelResponse.model_validate(hotel)
-        return jsonify(response.model_dump()), 200
+        return Response(response.model_dump_json(), status=200, mimetype='application/json')
         
     except ValidationError as error:
         return jsonify({
@@ -184,7 +258,7 @@ def delete_hotel(hotel_id: int):
         500: Internal server error
     """
     try:
-        service = HotelService()
+        service = _hotel_service
         deleted = service.delete_hotel(hotel_id)
         
         if not deleted:
@@ -1,11 +1,56 @@
-from flask import Blueprint, request, jsonify, current_app
-from pydantic import ValidationError
-from schemas.review_schema import ReviewCreate, ReviewResponse, ReviewListResponse
-from services.reviews_service import ReviewService
-from models.review import ReviewStatus
+import orjson
+from flask import Blueprint, Response, request, stream_with_context, jsonify, current_app
+from pydantic import TypeAdapter, ValidationError
+from schemas.review_schema import ReviewBulkCreate, ReviewCreate, ReviewResponse, ReviewQueryParams
+from services.reviews_service import HotelNotFoundError, ReviewService
 
 reviews_bp = Blueprint('reviews', __name__)
 
+# Stateless (repositories go through the scoped db.session), so shared across requests
+_review_service = ReviewService()
+
+# Serializes one list item at a time for the streamed list bodies
+REVIEW_ADAPTER = TypeAdapter(ReviewResponse)
+REVIEW_QUERY_ADAPTER = TypeAdapter(ReviewQueryParams)
+
+def _list_response(reviews, page_size, next_cursor, total=None, page=None, total_pages=None):
+    """Stream a page of reviews as a ReviewListResponse-shaped JSON body"""
+    if page is None:
+        meta = {'page_size': page_size, 'next_cursor': next_cursor}
+    else:
+        meta = {
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'next_cursor': next_cursor
+        }
+
+    return _items_response(reviews, b'],' + orjson.dumps(meta)[1:])
+
+def _items_response(reviews, tail, status=200):
+    """Stream {"items": [...reviews...]} followed by tail (the closing bytes, after the list)"""
+    # The first item is serialized before the status is sent, so that failure is still a 500
+    items = iter(reviews)
+    first = next(items, None)
+    head = b'{"items":['
+    if first is not None:
+        head += REVIEW_ADAPTER.dump_json(ReviewResponse.from_orm_fast(first))
+
+    def generate():
+        # Each item is written as soon as it is serialized; the page is never joined into one buffer
+        yield head
+        try:
+            for review in items:
+                yield b',' + REVIEW_ADAPTER.dump_json(ReviewResponse.from_orm_fast(review))
+        except Exception:
+            # The 200 is already sent: log and let the server abort the truncated body
+            current_app.logger.exception("❌ Failed to stream review list")
+            raise
+        yield tail
+
+    return Response(stream_with_context(generate()), status=status, mimetype='application/json')
+
 @reviews_bp.route('', methods=['POST'])
 def create_review():
     """
@@ -20,13 +65,13 @@ def create_review():
         500: Internal server error
     """
     try:
-        review_data = ReviewCreate(**request.json)
+        review_data = ReviewCreate(**request.get_json(cache=True))
         
-        service = ReviewService()
+        service = _review_service
         review = service.create_review(review_data.model_dump())
         
         response = ReviewResponse.model_validate(review)
-        return jsonify(response.model_dump()), 201
+        return Response(response.model_dump_json(), status=201, mimetype='application/json')
         
     except ValidationError as error:
         return jsonify({
@@ -39,13 +84,46 @@ def create_review():
         current_app.logger.error(f"Error creating review: {error}")
         return jsonify({'error': 'Internal server error'}), 500
     
+@reviews_bp.route('/bulk', methods=['POST'])
+def bulk_create_reviews():
+    """
+    Create several reviews in one request (e.g. importing historical reviews).
+    
+    Request Body:
+        JSON with the reviews to create (see ReviewBulkCreate schema)
+    
+    Returns:
+        201: JSON response with the created reviews, in request order
+        400: Validation error or invalid data (nothing is created)
+        500: Internal server error
+    """
+    try:
+        bulk_data = ReviewBulkCreate(**request.get_json(cache=True))
+        
+        service = _review_service
+        reviews = service.bulk_create_reviews([item.model_dump() for item in bulk_data.items])
+        
+        return _items_response(reviews, b']}', status=201)
+        
+    except ValidationError as error:
+        return jsonify({
+            'error': 'Validation error',
+            'details': error.errors()
+        }), 400
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    except Exception as error:
+        current_app.logger.error(f"Error creating reviews: {error}")
+        return jsonify({'error': 'Internal server error'}), 500
+    
 @reviews_bp.route('', methods=['GET'])
 def list_reviews():
     """
     List all reviews with pagination and filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page; pass it empty for the first page
+        page (int): Page number (default: 1, deprecated in favour of cursor)
         page_size (int): Items per page (default: 20)
         status (str): Filter by status (pending/processing/completed/failed)
     
@@ -55,42 +133,58 @@ def list_reviews():
         500: Internal server error
     """
     try:
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('page_size', current_app.config['DEFAULT_PAGE_SIZE']))
-        status_str = request.args.get('status')
+        params = REVIEW_QUERY_ADAPTER.validate_python(request.args.to_dict())
+        cursor = params.cursor
+        page = params.page
+        page_size = min(
+            params.page_size or current_app.config['DEFAULT_PAGE_SIZE'],
+            current_app.config['MAX_PAGE_SIZE']
+        )
+        status = params.status
 
-        if page < 1:
-            return jsonify({'error': 'Page must be >= 1'}), 400
-        
-        page_size = min(page_size, current_app.config['MAX_PAGE_SIZE'])
-
-        status = None
-        if status_str:
-            try:
-                status = ReviewStatus(status_str.lower())
-            except ValueError:
-                return jsonify({
-                    'error': f'Invalid status: {status_str}',
-                    'valid_statuses': [s.value for s in ReviewStatus]
-                }), 400
-
-        service = ReviewService()
-        reviews, total, total_pages = service.list_reviews(
+        service = _review_service
+
+        # Keyset pagination: seek from the cursor, no OFFSET and no COUNT
+        if cursor is not None:
+            reviews, next_cursor = service.list_reviews_after(
+                cursor=cursor,
+                page_size=page_size,
+                status=status
+            )
+            return _list_response(
+                reviews,
+                page_size,
+                next_cursor
+            )
+
+        if 'page' in request.args:
+            current_app.logger.warning("⚠️ GET /reviews?page= is deprecated, use cursor= instead")
+
+        reviews, has_more, total, total_pages = service.list_reviews(
             page=page,
             page_size=page_size,
-            status=status
+            status=status,
+            with_total=current_app.config['REVIEW_LIST_TOTALS']
         )
 
-        response = ReviewListResponse(
-            items=[ReviewResponse.model_validate(review) for review in reviews],
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        next_cursor = service.cursor_after(reviews[-1]) if has_more else None
+
+        return _list_response(
+            reviews,
+            page_size,
+            next_cursor,
+            total,
+            page,
+            total_pages
         )
         
-        return jsonify(response.model_dump()), 200
-        
+    except ValidationError as error:
+        return jsonify({
+            'error': 'Validation error',
+            'details': error.errors()
+        }), 400
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
     except Exception as error:
         current_app.logger.error(f"Error listing reviews: {error}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -105,18 +199,29 @@ def get_review(review_id: int):
     
     Returns:
         200: JSON response with review details
+        304: Review unchanged since the ETag sent in If-None-Match
         404: Review not found
         500: Internal server error
     """
     try:
-        service = ReviewService()
-        review = service.get_review(review_id, with_hotel=True)
+        service = _review_service
+        # ReviewResponse carries only hotel_id, so the hotel row isn't joined in
+        review = service.get_review(review_id)
         
         if not review:
             return jsonify({'error': 'Review not found'}), 404
         
-        response = ReviewResponse.model_validate(review)
-        return jsonify(response.model_dump()), 200
+        # updated_at moves whenever the analysis results are written
+        etag = f'{review.id}-{int(review.updated_at.timestamp() * 1_000_000)}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = ReviewResponse.model_validate(review)
+            response = Response(response.model_dump_json(), status=200, mimetype='application/json')
+        
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        return response
         
     except Exception as error:
         current_app.logger.error(f"Error getting review {review_id}: {error}")
@@ -131,7 +236,8 @@ def list_hotel_reviews(hotel_id: int):
         hotel_id: Hotel ID
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page; pass it empty for the first page
+        page (int): Page number (default: 1, deprecated in favour of cursor)
         page_size (int): Items per page (default: 20)
         status (str): Filter by status
     
@@ -142,45 +248,62 @@ def list_hotel_reviews(hotel_id: int):
         500: Internal server error
     """
     try:
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('page_size', current_app.config['DEFAULT_PAGE_SIZE']))
-        status_str = request.args.get('status')
+        params = REVIEW_QUERY_ADAPTER.validate_python(request.args.to_dict())
+        cursor = params.cursor
+        page = params.page
+        page_size = min(
+            params.page_size or current_app.config['DEFAULT_PAGE_SIZE'],
+            current_app.config['MAX_PAGE_SIZE']
+        )
+        status = params.status
 
-        if page < 1:
-            return jsonify({'error': 'Page must be >= 1'}), 400
-        
-        page_size = min(page_size, current_app.config['MAX_PAGE_SIZE'])
-
-        status = None
-        if status_str:
-            try:
-                status = ReviewStatus(status_str.lower())
-            except ValueError:
-                return jsonify({
-                    'error': f'Invalid status: {status_str}',
-                    'valid_statuses': [s.value for s in ReviewStatus]
-                }), 400
-
-        service = ReviewService()
-        reviews, total, total_pages = service.list_hotel_reviews(
+        service = _review_service
+
+        # Keyset pagination: seek from the cursor, no OFFSET and no COUNT
+        if cursor is not None:
+            reviews, next_cursor = service.list_hotel_reviews_after(
+                hotel_id=hotel_id,
+                cursor=cursor,
+                page_size=page_size,
+                status=status
+            )
+            return _list_response(
+                reviews,
+                page_size,
+                next_cursor
+            )
+
+        if 'page' in request.args:
+            current_app.logger.warning("⚠️ GET /reviews/hotels/<id>?page= is deprecated, use cursor= instead")
+
+        reviews, has_more, total, total_pages = service.list_hotel_reviews(
             hotel_id=hotel_id,
             page=page,
             page_size=page_size,
-            status=status
+            status=status,
+            with_total=current_app.config['REVIEW_LIST_TOTALS']
         )
 
-        response = ReviewListResponse(
-            items=[ReviewResponse.model_validate(review) for review in reviews],
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        next_cursor = service.cursor_after(reviews[-1]) if has_more else None
+
+        return _list_response(
+            reviews,
+            page_size,
+            next_cursor,
+            total,
+            page,
+            total_pages
         )
         
-        return jsonify(response.model_dump()), 200
-        
-    except ValueError as error:
+    except ValidationError as error:
+        return jsonify({
+            'error': 'Validation error',
+            'details': error.errors()
+        }), 400
+    except HotelNotFoundError as error:
         return jsonify({'error': str(error)}), 404
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
     except Exception as error:
         current_app.logger.error(f"Error listing hotel reviews: {error}")
         return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
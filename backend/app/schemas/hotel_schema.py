@@ -1,9 +1,12 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from schemas.pagination_schema import PaginationParams
 
 class HotelBase(BaseModel):
-    """Base schema with common hotel fields"""
+    """Base schema with common hotel fields (stripped, so blank names fail min_length)"""
+    
+    model_config = ConfigDict(str_strip_whitespace=True, extra='ignore')
     
     name: str = Field(..., min_length=1, max_length=200, description="Hotel name")
     city: str = Field(..., min_length=1, max_length=100, description="City location")
@@ -38,6 +41,8 @@ class HotelUpdate(BaseModel):
         }
     """
     
+    model_config = ConfigDict(str_strip_whitespace=True, extra='ignore')
+    
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     city: Optional[str] = Field(None, min_length=1, max_length=100)
     country: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -68,6 +73,11 @@ class HotelResponse(HotelBase):
     
     model_config = ConfigDict(from_attributes=True, exclude=['reviews'])
 
+    @classmethod
+    def from_orm_fast(cls, hotel) -> "HotelResponse":
+        """Build from a Hotel row loaded from the database, skipping validation"""
+        return cls.model_construct(**{name: getattr(hotel, name) for name in cls.model_fields})
+
 class HotelListResponse(BaseModel):
     """
     Schema for paginated hotel list responses.
@@ -78,12 +88,31 @@ class HotelListResponse(BaseModel):
             "total": 100,
             "page": 1,
             "page_size": 20,
-            "total_pages": 5
+            "total_pages": 5,
+            "next_cursor": "eyJuYW1lIjoi..."
         }
+    
+    Requests made with a cursor only carry items, page_size and
+    next_cursor; total, page and total_pages are left out since they
+    would need a COUNT over the whole result set.
     """
     
     items: list[HotelResponse]
-    total: int = Field(..., description="Total number of hotels")
-    page: int = Field(..., ge=1, description="Current page number")
+    total: Optional[int] = Field(None, description="Total number of hotels (page requests only)")
+    page: Optional[int] = Field(None, ge=1, description="Current page number (page requests only)")
     page_size: int = Field(..., ge=1, le=100, description="Items per page")
-    total_pages: int = Field(..., description="Total number of pages")
\ No newline at end of file
+    total_pages: Optional[int] = Field(None, description="Total number of pages (page requests only)")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
+class HotelQueryParams(PaginationParams):
+    """Query parameters of GET /hotels"""
+    
+    city: Optional[str] = Field(None, description="Filter by city")
+    country: Optional[str] = Field(None, description="Filter by country")
+    min_rating: Optional[float] = Field(None, ge=1, le=5, description="Minimum star rating")
+
+    @field_validator('min_rating', mode='before')
+    @classmethod
+    def blank_as_unset(cls, value):
+        """Treat ?min_rating= as no filter"""
+        return None if value == '' else value
\ No newline at end of file
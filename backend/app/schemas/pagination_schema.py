@@ -0,0 +1,15 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class PaginationParams(BaseModel):
+    """
+    Query parameters shared by the paginated list endpoints.
+
+    page_size is left unset by default so the handlers can apply
+    DEFAULT_PAGE_SIZE and cap it at MAX_PAGE_SIZE from the app config.
+    """
+
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page (empty for the first page)")
+    page: int = Field(1, ge=1, description="Page number (deprecated in favour of cursor)")
+    page_size: Optional[int] = Field(None, ge=1, description="Items per page")
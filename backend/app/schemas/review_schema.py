@@ -1,10 +1,20 @@
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict, field_validator
+from models.review import ReviewStatus
+from schemas.pagination_schema import PaginationParams
 
 
 class ReviewBase(BaseModel):
-    """Base schema with common review fields"""
+    """
+    Base schema with common review fields.
+    
+    Strings are stripped before the length checks, so blank names and
+    content shorter than 10 characters are rejected here; the service
+    does not validate again.
+    """
+    
+    model_config = ConfigDict(str_strip_whitespace=True, extra='ignore')
     
     hotel_id: int = Field(..., gt=0, description="ID of the hotel being reviewed")
     user_name: str = Field(..., min_length=1, max_length=100, description="Reviewer's name")
@@ -12,22 +22,6 @@ class ReviewBase(BaseModel):
     title: Optional[str] = Field(None, max_length=200, description="Review title")
     content: str = Field(..., min_length=10, description="Review text content")
 
-    @field_validator('user_name')
-    @classmethod
-    def validate_user_name(cls, value: str) -> str:
-        """Validate that user name is not empty or whitespace only"""
-        if not value.strip():
-            raise ValueError('User name cannot be empty or whitespace')
-        return value.strip()
-    
-    @field_validator('content')
-    @classmethod
-    def validate_content(cls, value: str) -> str:
-        """Validate that content is not empty or whitespace only"""
-        if not value.strip():
-            raise ValueError('Review content cannot be empty or whitespace')
-        return value.strip()
-
 class ReviewCreate(ReviewBase):
     """
     Schema for creating a new review.
@@ -43,6 +37,21 @@ class ReviewCreate(ReviewBase):
     """
     pass
 
+class ReviewBulkCreate(BaseModel):
+    """
+    Schema for creating several reviews in one request.
+    
+    Example:
+        {
+            "items": [
+                {"hotel_id": 1, "user_name": "Marina Hoffmann", "rating": 5, "content": "..."},
+                {"hotel_id": 2, "user_name": "Ana Souza", "rating": 4, "content": "..."}
+            ]
+        }
+    """
+    
+    items: list[ReviewCreate] = Field(..., min_length=1, max_length=500, description="Reviews to create")
+
 class AspectScore(BaseModel):
     """Schema for individual aspect analysis"""
     
@@ -103,6 +112,16 @@ class ReviewResponse(ReviewBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_orm_fast(cls, review) -> "ReviewResponse":
+        """Build from a Review row loaded from the database, skipping validation"""
+        fields = {name: getattr(review, name) for name in cls.model_fields}
+        # The only conversions model_validate would do for a stored row
+        fields['status'] = review.status.value
+        if fields['aspects']:
+            fields['aspects'] = [AspectScore.model_construct(**aspect) for aspect in fields['aspects']]
+        return cls.model_construct(**fields)
+
 class ReviewListResponse(BaseModel):
     """
     Schema for paginated review list responses.
@@ -110,15 +129,40 @@ class ReviewListResponse(BaseModel):
     Example:
         {
             "items": [...],
-            "total": 150,
+            "total": null,
             "page": 1,
             "page_size": 20,
-            "total_pages": 8
+            "total_pages": null,
+            "next_cursor": "eyJjcmVhdGVkX2F0Ijoi..."
         }
+    
+    Cursor requests return only items, page_size and next_cursor. total
+    and total_pages are only filled in when REVIEW_LIST_TOTALS is enabled.
     """
     
     items: list[ReviewResponse]
-    total: int = Field(..., description="Total number of reviews")
-    page: int = Field(..., ge=1, description="Current page number")
+    total: Optional[int] = Field(None, description="Total number of reviews (page requests with REVIEW_LIST_TOTALS only)")
+    page: Optional[int] = Field(None, ge=1, description="Current page number (page requests only)")
     page_size: int = Field(..., ge=1, le=100, description="Items per page")
-    total_pages: int = Field(..., description="Total number of pages")
\ No newline at end of file
+    total_pages: Optional[int] = Field(None, description="Total number of pages (page requests with REVIEW_LIST_TOTALS only)")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
+# Status value -> member, so a valid ?status= resolves with one dict lookup
+_STATUS_MAP = {status.value: status for status in ReviewStatus}
+
+class ReviewQueryParams(PaginationParams):
+    """Query parameters of the review list endpoints"""
+    
+    status: Optional[ReviewStatus] = Field(None, description="Filter by status")
+
+    @field_validator('status', mode='before')
+    @classmethod
+    def normalize_status(cls, value):
+        """Accept statuses in any case, treat ?status= as no filter"""
+        if isinstance(value, str):
+            value = value.lower()
+            if not value:
+                return None
+            # Unknown values are left for the enum check to reject
+            return _STATUS_MAP.get(value, value)
+        return value
\ No newline at end of file
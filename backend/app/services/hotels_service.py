@@ -2,6 +2,7 @@ import logging
 from typing import Optional, Tuple, List
 from repository.hotels_repository import HotelRepository
 from models.hotel import Hotel
+from services.pagination import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,47 @@ class HotelService:
         
         return hotels, total, total_pages
     
+    def list_hotels_after(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        min_rating: Optional[float] = None
+    ) -> Tuple[List[Hotel], Optional[str]]:
+        """
+        Get the page of hotels following a cursor (keyset pagination, no COUNT).
+        
+        Args:
+            cursor: next_cursor of the previous page (None/empty for the first page)
+            page_size: Number of items per page
+            city: Filter by city (optional)
+            country: Filter by country (optional)
+            min_rating: Minimum star rating (optional)
+            
+        Returns:
+            Tuple of (hotels list, cursor of the next page or None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        after = decode_cursor(cursor, name=str, last_id=int) if cursor else None
+        
+        hotels, has_more = self.repository.get_after(
+            after=after,
+            page_size=page_size,
+            city=city,
+            country=country,
+            min_rating=min_rating
+        )
+        
+        return hotels, self.cursor_after(hotels[-1]) if has_more else None
+    
+    @staticmethod
+    def cursor_after(hotel: Hotel) -> str:
+        """Cursor pointing just past the given hotel"""
+        return encode_cursor({'name': hotel.name, 'last_id': hotel.id})
+    
     def get_hotel(self, hotel_id: int) -> Optional[Hotel]:
         """
         Get hotel by ID.
@@ -71,16 +113,11 @@ class HotelService:
         Create a new hotel.
         
         Args:
-            hotel_data: Dictionary with hotel attributes
+            hotel_data: Hotel attributes, already validated by HotelCreate
             
         Returns:
             Created Hotel instance
-            
-        Raises:
-            ValueError: If hotel data is invalid
         """
-        self._validate_hotel_data(hotel_data)
-        
         hotel = self.repository.create(hotel_data)
         logger.info(f"Created hotel: {hotel.id} - {hotel.name}")
         
@@ -92,19 +129,11 @@ class HotelService:
         
         Args:
             hotel_id: Hotel ID
-            update_data: Dictionary with fields to update
+            update_data: Fields sent by the client (HotelUpdate dumped with exclude_unset)
             
         Returns:
             Updated Hotel instance or None if not found
-            
-        Raises:
-            ValueError: If update data is invalid
         """
-        update_data = {k: v for k, v in update_data.items() if v is not None}
-        
-        if update_data:
-            self._validate_hotel_data(update_data, partial=True)
-        
         hotel = self.repository.update(hotel_id, update_data)
         
         if hotel:
@@ -112,34 +141,6 @@ class HotelService:
         
         return hotel
     
-    def _validate_hotel_data(self, data: dict, partial: bool = False):
-        """
-        Validate hotel data according to business rules.
-        
-        Args:
-            data: Hotel data to validate
-            partial: If True, only validates present fields
-            
-        Raises:
-            ValueError: If validation fails
-        """
-        if 'star_rating' in data:
-            rating = data['star_rating']
-            if rating is not None and not (1 <= rating <= 5):
-                raise ValueError("Star rating must be between 1 and 5")
-        
-        if 'name' in data and not partial:
-            if not data['name'] or not data['name'].strip():
-                raise ValueError("Hotel name is required")
-        
-        if 'city' in data and not partial:
-            if not data['city'] or not data['city'].strip():
-                raise ValueError("City is required")
-        
-        if 'country' in data and not partial:
-            if not data['country'] or not data['country'].strip():
-                raise ValueError("Country is required")
-            
     def delete_hotel(self, hotel_id: int) -> bool:
         """
         Delete a hotel.
@@ -0,0 +1,43 @@
+import base64
+import orjson
+
+
+def encode_cursor(position: dict) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        position: Sort key of the last row (e.g. {'name': ..., 'last_id': ...})
+
+    Returns:
+        URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(position)).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, **keys: type) -> tuple:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous response
+        keys: Key the cursor must contain -> type of its value, in sort key order
+
+    Returns:
+        Tuple of the sort key values
+
+    Raises:
+        ValueError: If the cursor is malformed or a value has the wrong type
+    """
+    try:
+        position = orjson.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values = tuple(position[key] for key in keys)
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+    # The values go straight into the keyset WHERE clause, so a forged cursor must not get past here
+    for value, expected in zip(values, keys.values()):
+        # bool is an int subclass, but never a valid id
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+    return values
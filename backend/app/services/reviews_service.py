@@ -1,12 +1,18 @@
 import logging
+from datetime import datetime
 from typing import Optional, Tuple, List
 from repository.hotels_repository import HotelRepository
 from repository.reviews_repository import ReviewRepository
 from models.review import Review, ReviewStatus
-from queue_publisher import get_publisher
+from sqlalchemy.exc import IntegrityError
+from queue_publisher import get_batcher
+from services.pagination import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
+class HotelNotFoundError(ValueError):
+    """Raised when the hotel a request is scoped to doesn't exist"""
+
 class ReviewService:
     """
     Service class for review business logic.
@@ -33,49 +39,97 @@ class ReviewService:
         Create a new review.
         
         Args:
-            review_data: Dictionary with review attributes
+            review_data: Review attributes, already validated by ReviewCreate
             
         Returns:
             Created Review instance
             
         Raises:
-            ValueError: If review data is invalid or hotel doesn't exist
+            ValueError: If hotel_id is missing or the hotel doesn't exist
         """
         hotel_id = review_data.get('hotel_id')
-        if not self.hotel_repo.exists(hotel_id):
+        # Callers other than the route may skip ReviewCreate; don't look up a None id
+        if hotel_id is None:
+            raise ValueError("hotel_id is required")
+        if not self.hotel_repo.exists_cached(hotel_id):
             raise ValueError(f"Hotel with ID {hotel_id} does not exist")
         
-        self._validate_review_data(review_data)
-        
         review_data['status'] = ReviewStatus.PENDING
         
-        review = self.review_repo.create(review_data)
-        logger.info(f"Created review: {review.id} for hotel: {hotel_id}")
-        
-        # Publish to RabbitMQ for analysis
         try:
-            publisher = get_publisher()
-            publisher.publish_review(
-                review_id=review.id,
-                review_data={
-                    'content': review.content,
-                    'title': review.title,
-                    'rating': review.rating,
-                    'hotel_id': review.hotel_id
-                }
-            )
-            logger.info(f"✅ Review {review.id} sent to queue")
-        except Exception as e:
-            logger.error(f"⚠️ Error publishing review {review.id}: {e}")
+            review = self.review_repo.create(review_data)
+        except IntegrityError:
+            # Hotel deleted since it was cached (e.g. by another worker)
+            self.review_repo.session.rollback()
+            raise ValueError(f"Hotel with ID {hotel_id} does not exist")
+        # Per-request logs use %-style args, formatted only if INFO is enabled
+        logger.info("Created review: %s for hotel: %s", review.id, hotel_id)
+        
+        # Queue for RabbitMQ; the batcher's thread publishes it for analysis
+        if get_batcher().enqueue(review_id=review.id, review_data=self._event_data(review)):
+            logger.info("✅ Review %s queued for analysis", review.id)
         
         return review
     
+    def bulk_create_reviews(self, items: List[dict]) -> List[Review]:
+        """
+        Create several reviews at once.
+        
+        All hotels are checked before anything is written, the reviews are
+        inserted with one statement, and their ReviewCreated events go to
+        the batcher together so they share publishes and confirms.
+        
+        Args:
+            items: Review attributes, already validated by ReviewCreate
+            
+        Returns:
+            Created Review instances, in the order of items
+            
+        Raises:
+            ValueError: If any of the hotels doesn't exist
+        """
+        hotel_ids = {item['hotel_id'] for item in items}
+        missing = hotel_ids - self.hotel_repo.exists_many(hotel_ids)
+        if missing:
+            raise ValueError(f"Hotel with ID {min(missing)} does not exist")
+        
+        for item in items:
+            item['status'] = ReviewStatus.PENDING
+        
+        try:
+            reviews = self.review_repo.bulk_create(items)
+        except IntegrityError:
+            # A hotel deleted since it was cached (e.g. by another worker)
+            self.review_repo.session.rollback()
+            raise ValueError("One of the hotels does not exist")
+        logger.info("Created %d reviews", len(reviews))
+        
+        batcher = get_batcher()
+        queued = sum(
+            batcher.enqueue(review_id=review.id, review_data=self._event_data(review))
+            for review in reviews
+        )
+        logger.info("✅ %d of %d reviews queued for analysis", queued, len(reviews))
+        
+        return reviews
+    
+    @staticmethod
+    def _event_data(review: Review) -> dict:
+        """Review fields carried by its ReviewCreated event"""
+        return {
+            'hotel_id': review.hotel_id,
+            'rating': review.rating,
+            'title': review.title,
+            'content': review.content
+        }
+    
     def list_reviews(
         self,
         page: int = 1,
         page_size: int = 20,
-        status: Optional[ReviewStatus] = None
-    ) -> Tuple[List[Review], int, int]:
+        status: Optional[ReviewStatus] = None,
+        with_total: bool = False
+    ) -> Tuple[List[Review], bool, Optional[int], Optional[int]]:
         """
         Get paginated list of all reviews.
         
@@ -83,10 +137,20 @@ class ReviewService:
             page: Page number (1-indexed)
             page_size: Number of items per page
             status: Filter by status (optional)
+            with_total: Also count the matching reviews (costs a scan of all of them)
             
         Returns:
-            Tuple of (reviews list, total count, total pages)
+            Tuple of (reviews list, whether more pages follow, total count, total pages);
+            the counts are None unless with_total is set
         """
+        if not with_total:
+            reviews, has_more = self.review_repo.get_page(
+                page=page,
+                page_size=page_size,
+                status=status
+            )
+            return reviews, has_more, None, None
+        
         reviews, total = self.review_repo.get_all(
             page=page,
             page_size=page_size,
@@ -95,15 +159,60 @@ class ReviewService:
         
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
         
-        return reviews, total, total_pages    
+        return reviews, page < total_pages, total, total_pages
+    
+    def list_reviews_after(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        status: Optional[ReviewStatus] = None
+    ) -> Tuple[List[Review], Optional[str]]:
+        """
+        Get the page of reviews following a cursor (keyset pagination, no COUNT).
+        
+        Args:
+            cursor: next_cursor of the previous page (None/empty for the first page)
+            page_size: Number of items per page
+            status: Filter by status (optional)
+            
+        Returns:
+            Tuple of (reviews list, cursor of the next page or None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        reviews, has_more = self.review_repo.get_after(
+            after=self._decode_cursor(cursor),
+            page_size=page_size,
+            status=status
+        )
+        
+        return reviews, self.cursor_after(reviews[-1]) if has_more else None
+    
+    @staticmethod
+    def cursor_after(review: Review) -> str:
+        """Cursor pointing just past the given review"""
+        return encode_cursor({'created_at': review.created_at.isoformat(), 'last_id': review.id})
+    
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+        """(created_at, id) position of a cursor from cursor_after, None for the first page"""
+        if not cursor:
+            return None
+        created_at, last_id = decode_cursor(cursor, created_at=str, last_id=int)
+        try:
+            return datetime.fromisoformat(created_at), last_id
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
     
     def list_hotel_reviews(
         self,
         hotel_id: int,
         page: int = 1,
         page_size: int = 20,
-        status: Optional[ReviewStatus] = None
-    ) -> Tuple[List[Review], int, int]:
+        status: Optional[ReviewStatus] = None,
+        with_total: bool = False
+    ) -> Tuple[List[Review], bool, Optional[int], Optional[int]]:
         """
         Get paginated reviews for a specific hotel.
         
@@ -112,15 +221,26 @@ class ReviewService:
             page: Page number (1-indexed)
             page_size: Number of items per page
             status: Filter by status (optional)
+            with_total: Also count the matching reviews (costs a scan of all of them)
             
         Returns:
-            Tuple of (reviews list, total count, total pages)
+            Tuple of (reviews list, whether more pages follow, total count, total pages);
+            the counts are None unless with_total is set
             
         Raises:
-            ValueError: If hotel doesn't exist
+            HotelNotFoundError: If hotel doesn't exist
         """
-        if not self.hotel_repo.exists(hotel_id):
-            raise ValueError(f"Hotel with ID {hotel_id} does not exist")
+        if not self.hotel_repo.exists_cached(hotel_id):
+            raise HotelNotFoundError(f"Hotel with ID {hotel_id} does not exist")
+        
+        if not with_total:
+            reviews, has_more = self.review_repo.get_page(
+                page=page,
+                page_size=page_size,
+                status=status,
+                hotel_id=hotel_id
+            )
+            return reviews, has_more, None, None
         
         reviews, total = self.review_repo.get_by_hotel(
             hotel_id=hotel_id,
@@ -131,40 +251,55 @@ class ReviewService:
         
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
         
-        return reviews, total, total_pages
+        return reviews, page < total_pages, total, total_pages
     
-    def get_review(self, review_id: int, with_hotel: bool = False) -> Optional[Review]:
+    def list_hotel_reviews_after(
+        self,
+        hotel_id: int,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        status: Optional[ReviewStatus] = None
+    ) -> Tuple[List[Review], Optional[str]]:
         """
-        Get review by ID.
+        Get the page of a hotel's reviews following a cursor (keyset pagination, no COUNT).
         
         Args:
-            review_id: Review ID
-            with_hotel: If True, include hotel data
+            hotel_id: Hotel ID
+            cursor: next_cursor of the previous page (None/empty for the first page)
+            page_size: Number of items per page
+            status: Filter by status (optional)
             
         Returns:
-            Review instance or None if not found
+            Tuple of (reviews list, cursor of the next page or None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+            HotelNotFoundError: If hotel doesn't exist
         """
-        return self.review_repo.get_by_id(review_id, with_hotel=with_hotel)
+        after = self._decode_cursor(cursor)
+        
+        # The hotel check comes back with the page, no separate query
+        reviews, has_more, hotel_exists = self.review_repo.get_by_hotel_checked(
+            hotel_id=hotel_id,
+            after=after,
+            page_size=page_size,
+            status=status
+        )
+        
+        if not hotel_exists:
+            raise HotelNotFoundError(f"Hotel with ID {hotel_id} does not exist")
+        
+        return reviews, self.cursor_after(reviews[-1]) if has_more else None
     
-    def _validate_review_data(self, data: dict):
+    def get_review(self, review_id: int, with_hotel: bool = False) -> Optional[Review]:
         """
-        Validate review data according to business rules.
+        Get review by ID.
         
         Args:
-            data: Review data to validate
+            review_id: Review ID
+            with_hotel: If True, include hotel data
             
-        Raises:
-            ValueError: If validation fails
+        Returns:
+            Review instance or None if not found
         """
-        rating = data.get('rating')
-        if rating is not None:
-            if not 1 <= rating <= 5:
-                raise ValueError("Rating must be between 1 and 5")
-        
-        content = data.get('content', '').strip()
-        if len(content) < 10:
-            raise ValueError("Review content must be at least 10 characters")
-        
-        user_name = data.get('user_name', '').strip()
-        if not user_name:
-            raise ValueError("User name is required")
\ No newline at end of file
+        return self.review_repo.get_by_id(review_id, with_hotel=with_hotel)
@@ -1,14 +1,14 @@
-import sys
 import logging
 
-sys.path.insert(0, '/app/app')
 logger = logging.getLogger(__name__)
 
 if __name__ == '__main__':
+    # Run as a script (python app/start_consumer.py), like app.py, so this
+    # directory is already sys.path[0] and the imports need no path setup
     from app import create_app
     from result_consumer import start_consumer
     
     app = create_app()
     
     with app.app_context():
-        start_consumer()
\ No newline at end of file
+        start_consumer()
@@ -0,0 +1,38 @@
+"""
+Compile a .env file into backend/app/env_cache.py
+
+config.py imports the generated ENV dict instead of searching for and
+parsing .env on every start. Re-run after editing .env, or delete
+env_cache.py to go back to reading .env directly.
+
+Usage:
+    python scripts/compile_env.py [path/to/.env]
+"""
+import os
+import sys
+from dotenv import dotenv_values, find_dotenv
+
+OUTPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'app', 'env_cache.py')
+
+
+def main():
+    dotenv_path = sys.argv[1] if len(sys.argv) > 1 else find_dotenv(usecwd=True)
+    if not dotenv_path or not os.path.isfile(dotenv_path):
+        print("⚠️ No .env file found, skipping env cache")
+        return
+
+    values = {
+        key: value
+        for key, value in dotenv_values(dotenv_path, encoding='utf-8').items()
+        if value is not None
+    }
+
+    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
+        f.write(f"# Generated from {os.path.basename(dotenv_path)} by scripts/compile_env.py, do not edit\n")
+        f.write(f"ENV = {values!r}\n")
+
+    print(f"✅ Compiled {len(values)} variables into {os.path.normpath(OUTPUT_PATH)}")
+
+
+if __name__ == '__main__':
+    main()
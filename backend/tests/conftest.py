@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time, so point it at a scratch database first
+_DB_FILE = os.path.join(tempfile.mkdtemp(), 'test.db')
+os.environ['TEST_DATABASE_URL'] = f'sqlite:///{_DB_FILE}'
+
+from app import create_app
+from extensions import db
+from repository.hotels_repository import HotelRepository
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def hotel(app):
+    return HotelRepository(db.session).create({
+        'name': 'Test Hotel',
+        'city': 'Lisbon',
+        'country': 'Portugal',
+        'star_rating': 4
+    })
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from repository.hotels_repository import HotelRepository
+from repository.reviews_repository import ReviewRepository
+
+# Explicit timestamps: SQLite's server default has no microseconds, unlike what the ORM writes
+CREATED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _walk(client, url):
+    """Follow next_cursor from the first page to the last, return the ids in order"""
+    ids, cursor = [], ''
+    while cursor is not None:
+        page = client.get(f'{url}?page_size=2&cursor={cursor}').get_json()
+        ids += [item['id'] for item in page['items']]
+        cursor = page['next_cursor']
+    return ids
+
+
+def test_reviews_cursor_walk_is_complete(client, hotel):
+    repository = ReviewRepository(db.session)
+    # Several reviews share a created_at, so the id tiebreak decides their order
+    reviews = [
+        repository.create({
+            'hotel_id': hotel.id,
+            'user_name': f'Guest {index}',
+            'rating': 4,
+            'content': 'Lovely stay',
+            'created_at': CREATED_AT + timedelta(minutes=index // 3)
+        })
+        for index in range(7)
+    ]
+
+    ids = _walk(client, '/api/v1/reviews')
+
+    assert len(ids) == len(set(ids))
+    assert ids == [review.id for review in sorted(reviews, key=lambda r: (r.created_at, r.id), reverse=True)]
+
+
+def test_hotels_cursor_walk_is_complete(client):
+    repository = HotelRepository(db.session)
+    # Duplicate names, so the id tiebreak decides their order
+    hotels = [
+        repository.create({'name': name, 'city': 'Lisbon', 'country': 'Portugal'})
+        for name in ('Bravo', 'Alpha', 'Bravo', 'Alpha', 'Charlie', 'Bravo', 'Alpha')
+    ]
+
+    ids = _walk(client, '/api/v1/hotels')
+
+    assert len(ids) == len(set(ids))
+    assert ids == [hotel.id for hotel in sorted(hotels, key=lambda h: (h.name, h.id))]
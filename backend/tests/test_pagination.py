@@ -0,0 +1,26 @@
+import pytest
+
+from services.pagination import decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    cursor = encode_cursor({'name': 'Grand Hotel', 'last_id': 7})
+
+    assert decode_cursor(cursor, name=str, last_id=int) == ('Grand Hotel', 7)
+
+
+@pytest.mark.parametrize('position', [
+    {'name': 'Grand Hotel', 'last_id': 'x'},
+    {'name': 'Grand Hotel', 'last_id': None},
+    {'name': 'Grand Hotel', 'last_id': True},
+    {'name': 1, 'last_id': 7},
+    {'name': 'Grand Hotel'},
+])
+def test_forged_cursor_is_invalid(position):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(encode_cursor(position), name=str, last_id=int)
+
+
+def test_garbage_cursor_is_invalid():
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor('not-a-cursor', name=str, last_id=int)
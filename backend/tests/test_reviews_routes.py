@@ -0,0 +1,62 @@
+import pytest
+
+from extensions import db
+from repository.reviews_repository import ReviewRepository
+from routes import reviews_bp
+from services.pagination import encode_cursor
+
+
+def test_hotel_reviews_garbage_cursor_is_bad_request(client, hotel):
+    response = client.get(f'/api/v1/reviews/hotels/{hotel.id}?cursor=not-a-cursor')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_hotel_reviews_unknown_hotel_is_not_found(client):
+    response = client.get('/api/v1/reviews/hotels/999?cursor=')
+
+    assert response.status_code == 404
+
+
+def test_reviews_forged_cursor_is_bad_request(client):
+    cursor = encode_cursor({'created_at': '2025-01-01T00:00:00', 'last_id': 'x'})
+    response = client.get(f'/api/v1/reviews?cursor={cursor}')
+
+    assert response.status_code == 400
+
+
+def _review(hotel, **fields):
+    review = {'hotel_id': hotel.id, 'user_name': 'Guest', 'rating': 4, 'content': 'Lovely stay'}
+    review.update(fields)
+    return ReviewRepository(db.session).create(review)
+
+
+def test_list_failing_on_first_item_is_server_error(client, hotel, monkeypatch):
+    _review(hotel)
+
+    def broken(review):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(reviews_bp.ReviewResponse, 'from_orm_fast', broken)
+    response = client.get('/api/v1/reviews?cursor=')
+
+    assert response.status_code == 500
+
+
+def test_list_failing_mid_stream_is_aborted(client, hotel, monkeypatch):
+    _review(hotel)
+    _review(hotel)
+    serialize = reviews_bp.ReviewResponse.from_orm_fast
+    calls = []
+
+    def broken_after_first(review):
+        calls.append(review)
+        if len(calls) > 1:
+            raise RuntimeError('boom')
+        return serialize(review)
+
+    monkeypatch.setattr(reviews_bp.ReviewResponse, 'from_orm_fast', broken_after_first)
+
+    with pytest.raises(RuntimeError):
+        client.get('/api/v1/reviews?cursor=').get_data()